@@ -1,3 +1,48 @@
-from django.test import TestCase
+from core.tests import QueryBudgetTestCase
 
-# Create your tests here.
+
+class AccountQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_signup(self):
+        self.assertWithinBudget('post', '/auth/signup/', data={
+            'username': 'newcomer',
+            'email': 'newcomer@example.com',
+            'password': 'secret-pass',
+            'role': 'applicant',
+            'full_name': 'New Comer',
+        }, status=201)
+
+    def test_login_and_refresh(self):
+        response, _ = self.assertWithinBudget('post', '/auth/login/', data={
+            'username': 'recruiter',
+            'password': 'pass',
+        })
+        self.assertWithinBudget('post', '/auth/refresh/', data={'refresh': response.data['refresh']})
+
+    def test_me(self):
+        self.assertWithinBudget('get', '/auth/me/', self.applicant)
+
+    def test_me_under_accounts_prefix(self):
+        self.assertWithinBudget('get', '/accounts/me/', self.applicant)
+
+    def test_profile_update(self):
+        self.assertWithinBudget(
+            'patch', '/auth/me/update/', self.applicant,
+            data={'about': 'Backend developer'}, content_type='application/json',
+        )
+
+    def test_candidate_profile(self):
+        self.assertWithinBudget('get', f'/auth/candidates/{self.applicant.username}/', self.recruiter)
+
+    def test_delete_user(self):
+        _, light = self.assertWithinBudget('delete', '/auth/me/delete/', self.light_applicant, status=204)
+        _, heavy = self.assertWithinBudget('delete', '/auth/me/delete/', self.applicant, status=204)
+        self.assertConstantQueries(light, heavy)
+
+    def test_delete_user_releases_applicant_counts(self):
+        job = self.jobs[1]
+        before = type(job).objects.get(pk=job.pk).applicant_count
+
+        self.call('delete', '/auth/me/delete/', self.light_applicant)
+
+        self.assertEqual(type(job).objects.get(pk=job.pk).applicant_count, before - 1)
@@ -0,0 +1,330 @@
+"""
+Keyword generation for job descriptions.
+
+The Gemini client is created once per process and reused. Results are cached
+on a hash of the normalized description (TTL + LRU), and concurrent requests
+for the same description share a single upstream call.
+
+Batches fan out as coroutines on one long-lived event loop running in a
+background thread, at most `AI_KEYWORD_CONCURRENCY` upstream calls at a time
+per process. Keeping a single loop lets the client's pooled async
+connections be reused across requests.
+
+`AI_KEYWORD_BACKEND = "stub"` swaps Gemini for a local, deterministic model
+so development and tests never reach the network.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+from cachetools import TTLCache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_MODEL = "gemini-2.5-flash"
+MAX_KEYWORDS = 6
+MAX_DESCRIPTION_LENGTH = 2000
+
+PROMPT_TEMPLATE = """
+            You are an expert technical recruiter.
+
+            From the job description below, extract 5 to 6 concise, relevant technical skills or keywords which exactly matched with the given description.
+
+            Rules:
+            - Return ONLY a comma-separated list
+            - No explanations
+            - No numbering
+            - No extra text
+            - Keywords must be short (1 to 3 words)
+
+            Job Description:
+            \"\"\"
+            {description}
+            \"\"\"
+            """
+
+
+class KeywordGenerationError(Exception):
+    """The keyword model could not be reached or failed to answer."""
+
+
+def build_prompt(description):
+    return PROMPT_TEMPLATE.format(description=description)
+
+
+def validate_description(description):
+    """Return why `description` cannot be sent to the model, or None."""
+    if not description:
+        return "Description is required"
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        return "Description too long"
+    return None
+
+
+def check_keyword_request(user, data):
+    """
+    The description `user` asked keywords for, as (description, None, None),
+    or (None, error message, status code) when the request is refused.
+    `data` is the parsed request body, None when it could not be parsed.
+    """
+    if user.role != "recruiter":
+        return None, "Only recruiters can generate keywords", 403
+    if data is None:
+        return None, "Invalid request body", 400
+
+    description = str(data.get("description", "")).strip()
+    error = validate_description(description)
+    if error:
+        return None, error, 400
+    return description, None, None
+
+
+def check_batch_request(user, data):
+    """`check_keyword_request` for a batch; the descriptions are validated one by one later."""
+    if user.role != "recruiter":
+        return None, "Only recruiters can generate keywords", 403
+
+    descriptions = data.get("descriptions") if data is not None else None
+    if not isinstance(descriptions, list) or not descriptions:
+        return None, "descriptions must be a non-empty list", 400
+    if len(descriptions) > settings.AI_KEYWORD_BATCH_MAX:
+        return None, f"At most {settings.AI_KEYWORD_BATCH_MAX} descriptions per batch", 400
+
+    return [d.strip() if isinstance(d, str) else "" for d in descriptions], None, None
+
+
+def parse_keywords(raw_text):
+    keywords = [
+        re.sub(r"[^a-zA-Z0-9 +#.-]", "", k).strip().title()
+        for k in raw_text.split(",")
+    ]
+
+    # Remove empty & duplicates, enforce limit
+    return list(dict.fromkeys(filter(None, keywords)))[:MAX_KEYWORDS]
+
+
+def normalize_description(description):
+    return " ".join(description.lower().split())
+
+
+def description_key(description):
+    return hashlib.sha256(normalize_description(description).encode()).hexdigest()
+
+
+# Backends
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide Gemini client, created on first use."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            from google import genai
+            _client = genai.Client()
+    return _client
+
+
+def _gemini_generate(prompt):
+    response = get_client().models.generate_content(model=KEYWORD_MODEL, contents=prompt)
+    return response.text
+
+
+async def _gemini_agenerate(prompt):
+    response = await get_client().aio.models.generate_content(model=KEYWORD_MODEL, contents=prompt)
+    return response.text
+
+
+STUB_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the this to we will with you your "
+    "looking experience experienced years strong work working team role job candidate skills".split()
+)
+
+
+def _stub_generate(prompt):
+    """Most frequent meaningful words of the description, formatted like the model's answer."""
+    description = prompt.split('"""')[1] if '"""' in prompt else prompt
+    words = [
+        word for word in (w.rstrip(".") for w in re.findall(r"[a-z][a-z0-9+#.]*", description.lower()))
+        if len(word) > 2 and word not in STUB_STOP_WORDS
+    ]
+    return ", ".join(word for word, _ in Counter(words).most_common(MAX_KEYWORDS))
+
+
+async def _stub_agenerate(prompt):
+    return _stub_generate(prompt)
+
+
+BACKENDS = {
+    "gemini": _gemini_generate,
+    "stub": _stub_generate,
+}
+
+ASYNC_BACKENDS = {
+    "gemini": _gemini_agenerate,
+    "stub": _stub_agenerate,
+}
+
+
+def call_model(prompt):
+    """Raw text answer of the configured backend for `prompt`."""
+    return BACKENDS[settings.AI_KEYWORD_BACKEND](prompt)
+
+
+async def acall_model(prompt):
+    return await ASYNC_BACKENDS[settings.AI_KEYWORD_BACKEND](prompt)
+
+
+# Cache and coalescing
+
+_cache = TTLCache(maxsize=settings.AI_KEYWORD_CACHE_SIZE, ttl=settings.AI_KEYWORD_CACHE_TTL)
+_in_flight = {}
+_lock = threading.Lock()
+
+
+def _claim(key):
+    """Return (cached keywords, in-flight future, whether this caller must generate)."""
+    with _lock:
+        if key in _cache:
+            return list(_cache[key]), None, False
+
+        future = _in_flight.get(key)
+        if future is not None:
+            return None, future, False
+
+        future = _in_flight[key] = Future()
+        return None, future, True
+
+
+def _finish(key, future, keywords):
+    with _lock:
+        # An empty answer is passed on but not kept
+        if keywords:
+            _cache[key] = keywords
+        del _in_flight[key]
+    future.set_result(keywords)
+    return list(keywords)
+
+
+def _fail(key, future, error):
+    with _lock:
+        del _in_flight[key]
+    future.set_exception(error)
+
+
+def generate_keywords(description):
+    """
+    Keywords for a job description. Identical descriptions (ignoring case and
+    whitespace) are answered from the cache; a caller that arrives while the
+    same description is already being generated waits for that result.
+    """
+    key = description_key(description)
+    cached, future, leader = _claim(key)
+    if cached is not None:
+        return cached
+    if not leader:
+        return list(future.result())
+
+    try:
+        raw_text = _upstream(call_model, description)
+    except BaseException as e:
+        _fail(key, future, e)
+        raise
+    return _finish(key, future, parse_keywords(raw_text or ""))
+
+
+async def agenerate_keywords(description):
+    """`generate_keywords` for coroutines running on the keyword loop."""
+    key = description_key(description)
+    cached, future, leader = _claim(key)
+    if cached is not None:
+        return cached
+    if not leader:
+        return list(await asyncio.wrap_future(future))
+
+    try:
+        async with _get_semaphore():
+            raw_text = await _aupstream(description)
+    except BaseException as e:
+        _fail(key, future, e)
+        raise
+    return _finish(key, future, parse_keywords(raw_text or ""))
+
+
+def _upstream(call, description):
+    try:
+        return call(build_prompt(description))
+    except Exception as e:
+        logger.error(f"Keyword generation failed: {type(e).__name__} - {e}")
+        raise KeywordGenerationError(str(e)) from e
+
+
+async def _aupstream(description):
+    try:
+        return await acall_model(build_prompt(description))
+    except Exception as e:
+        logger.error(f"Keyword generation failed: {type(e).__name__} - {e}")
+        raise KeywordGenerationError(str(e)) from e
+
+
+# Batches
+
+_loop = None
+_loop_lock = threading.Lock()
+_semaphore = None
+
+
+def get_loop():
+    """The keyword loop, started on first use."""
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="ai-keywords", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _get_semaphore():
+    # Only ever used from the keyword loop, so it is created there
+    global _semaphore
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.AI_KEYWORD_CONCURRENCY)
+    return _semaphore
+
+
+async def agenerate_keywords_batch(descriptions):
+    async def one(description):
+        error = validate_description(description)
+        if error:
+            return {"error": error}
+        try:
+            return {"keywords": await agenerate_keywords(description)}
+        except KeywordGenerationError:
+            return {"error": "AI service unavailable"}
+
+    return await asyncio.gather(*(one(description) for description in descriptions))
+
+
+def generate_keywords_batch(descriptions):
+    """
+    Keywords for many descriptions at once, generated concurrently. Returns one
+    `{"keywords": [...]}` or `{"error": "..."}` per description, in order.
+    """
+    future = asyncio.run_coroutine_threadsafe(agenerate_keywords_batch(descriptions), get_loop())
+    return future.result()
+
+
+async def run_on_keyword_loop(coroutine):
+    """Await a keyword coroutine from another event loop, such as an ASGI worker's."""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, get_loop()))
@@ -1,6 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from .views import JobKeywordAIView
+from .views import AsyncJobKeywordAIView, AsyncJobKeywordBatchAIView, JobKeywordAIView, JobKeywordBatchAIView
+
+# Under ASGI the model calls are awaited on the event loop instead of holding a worker thread
+if settings.ASYNC_VIEWS:
+    keyword_view, keyword_batch_view = AsyncJobKeywordAIView, AsyncJobKeywordBatchAIView
+else:
+    keyword_view, keyword_batch_view = JobKeywordAIView, JobKeywordBatchAIView
 
 urlpatterns = [
-    path("job-keywords/", JobKeywordAIView.as_view(), name="job-keywords"),
+    path("job-keywords/", keyword_view.as_view(), name="job-keywords"),
+    path("job-keywords/batch/", keyword_batch_view.as_view(), name="job-keywords-batch"),
 ]
@@ -2,78 +2,75 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.conf import settings
 
-from google import genai
-import re
+from django.http import JsonResponse
+
+from core.async_views import AsyncAPIView
+from .keywords import (
+    KeywordGenerationError, agenerate_keywords, agenerate_keywords_batch, check_batch_request,
+    check_keyword_request, generate_keywords, generate_keywords_batch, run_on_keyword_loop,
+)
 
 class JobKeywordAIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        
-        if request.user.role != "recruiter":
-            return Response(
-                {"detail": "Only recruiters can generate keywords"},
-                status=status.HTTP_403_FORBIDDEN
-            )
 
-       
-        description = request.data.get("description", "").strip()
+        description, error, code = check_keyword_request(request.user, request.data)
+        if error:
+            return Response({"detail": error}, status=code)
 
-        if not description:
+        try:
+            keywords = generate_keywords(description)
+        except KeywordGenerationError:
             return Response(
-                {"detail": "Description is required"},
-                status=status.HTTP_400_BAD_REQUEST
+                {"detail": "AI service unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
-        if len(description) > 2000:
-            return Response(
-                {"detail": "Description too long"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return Response({"keywords": keywords}, status=status.HTTP_200_OK)
+
+
+class JobKeywordBatchAIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+
+        descriptions, error, code = check_batch_request(request.user, request.data)
+        if error:
+            return Response({"detail": error}, status=code)
+
+        results = generate_keywords_batch(descriptions)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
-        
-        client = genai.Client()
-        prompt = f"""
-            You are an expert technical recruiter.
 
-            From the job description below, extract 5 to 6 concise, relevant technical skills or keywords which exactly matched with the given description.
+class AsyncJobKeywordAIView(AsyncAPIView):
+    """JobKeywordAIView for ASGI deployments: the model call does not hold a worker thread."""
 
-            Rules:
-            - Return ONLY a comma-separated list
-            - No explanations
-            - No numbering
-            - No extra text
-            - Keywords must be short (1 to 3 words)
+    async def post(self, request):
 
-            Job Description:
-            \"\"\"
-            {description}
-            \"\"\"
-            """
+        description, error, code = check_keyword_request(request.user, self.parse_data(request))
+        if error:
+            return JsonResponse({"detail": error}, status=code)
 
         try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            )
-            raw_text = response.text
-        except Exception:
-            return Response(
-                {"detail": "AI service unavailable"},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
+            keywords = await run_on_keyword_loop(agenerate_keywords(description))
+        except KeywordGenerationError:
+            return JsonResponse({"detail": "AI service unavailable"}, status=503)
 
-        
-        keywords = [
-            re.sub(r"[^a-zA-Z0-9 +#.-]", "", k).strip().title()
-            for k in raw_text.split(",")
-        ]
+        return JsonResponse({"keywords": keywords}, status=200)
 
-        # Remove empty & duplicates
-        keywords = list(dict.fromkeys(filter(None, keywords)))
 
-        # Enforce limit
-        keywords = keywords[:6]
+class AsyncJobKeywordBatchAIView(AsyncAPIView):
+    """JobKeywordBatchAIView for ASGI deployments."""
 
-        return Response({"keywords": keywords}, status=status.HTTP_200_OK)
+    async def post(self, request):
+
+        descriptions, error, code = check_batch_request(request.user, self.parse_data(request))
+        if error:
+            return JsonResponse({"detail": error}, status=code)
+
+        results = await run_on_keyword_loop(agenerate_keywords_batch(descriptions))
+
+        return JsonResponse({"results": results}, status=200)
@@ -0,0 +1,230 @@
+"""
+Isolated PDF text extraction.
+
+PyPDF2 runs in a small pool of spawned worker processes so a malformed or
+oversized resume can never pin or bloat a web worker. Every document gets a
+page budget, a wall-clock budget and a CPU budget; when one runs out the pages
+read so far are returned instead of nothing. Workers are address-space limited
+and recycled after a fixed number of documents.
+
+Uploads spooled to disk are handed over by path and read straight from the
+file, so their contents never pass through the web worker's memory.
+"""
+import atexit
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PyPDF2 import PdfReader
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Extra time the parent waits on a worker beyond the document's own budget
+# before it gives up and replaces the pool.
+HARD_TIMEOUT_GRACE = 5
+
+
+class BudgetExceeded(BaseException):
+    """
+    Raised from a signal handler in the middle of parsing. A BaseException,
+    so the `except Exception` blocks inside PyPDF2 let it through.
+    """
+
+
+def _raise_budget_exceeded(signum, frame):
+    raise BudgetExceeded(signal.Signals(signum).name)
+
+
+def _init_worker(memory_limit_mb, pids):
+    # Report this worker to the engine, which may have to kill it
+    pids.put(os.getpid())
+
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    signal.signal(signal.SIGALRM, _raise_budget_exceeded)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_budget_exceeded)
+
+
+def _set_cpu_budget(cpu_seconds):
+    """Move the soft CPU limit to `cpu_seconds` past what this worker has already used."""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def read_pdf_pages(source, max_pages=None, timeout=None, cpu_seconds=None):
+    """
+    Return (text, pages_read, stop_reason) for the PDF in `source`, which is
+    either the document's bytes or the path of a file holding it.
+
+    `stop_reason` is None when every page was read, otherwise it names the
+    budget that cut extraction short. Time and CPU budgets are only enforced
+    inside extraction workers, where the signal handlers are installed.
+    """
+    parts = []
+    pages_read = 0
+    stop_reason = None
+    opened = None
+
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    _set_cpu_budget(cpu_seconds)
+
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        elif isinstance(source, (str, os.PathLike)):
+            source = opened = open(source, "rb")
+        reader = PdfReader(source)
+
+        for page in reader.pages:
+            if max_pages and pages_read >= max_pages:
+                stop_reason = "page_limit"
+                break
+
+            extracted = page.extract_text()
+            pages_read += 1
+            if extracted:
+                parts.append(extracted)
+    except BudgetExceeded as e:
+        stop_reason = "cpu_limit" if e.args[0] == "SIGXCPU" else "timeout"
+    except MemoryError:
+        stop_reason = "memory_limit"
+    finally:
+        if opened is not None:
+            opened.close()
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if resource is not None and cpu_seconds:
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+    return "\n".join(parts), pages_read, stop_reason
+
+
+class ExtractionEngine:
+    """Bounded process pool that runs `read_pdf_pages` under per-document budgets."""
+
+    def __init__(self, max_workers=2, max_pages=20, timeout=10, cpu_seconds=10,
+                 memory_limit_mb=512, max_tasks_per_child=50):
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_child = max_tasks_per_child
+
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pids = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context("spawn")
+                self._pids = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb, self._pids),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _discard_executor(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            pids, self._executor, self._pids = self._pids, None, None
+
+        # A worker stuck inside native code never returns, so it has to be
+        # killed before the pool can be shut down. Only live children are
+        # killed, as the PID of a recycled worker may since have been reused.
+        started = set()
+        while not pids.empty():
+            started.add(pids.get())
+        for process in multiprocessing.active_children():
+            if process.pid in started:
+                process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        pids.close()
+
+    def extract(self, source):
+        """Return the raw text of the PDF (bytes or a path), partial if a budget ran out."""
+        with self._slots:
+            executor = self._get_executor()
+            started = time.monotonic()
+            future = executor.submit(
+                read_pdf_pages, source, self.max_pages, self.timeout, self.cpu_seconds
+            )
+
+            try:
+                text, pages_read, stop_reason = future.result(timeout=self.timeout + HARD_TIMEOUT_GRACE)
+            except FutureTimeout:
+                logger.error("PDF extraction worker unresponsive, replacing extraction pool")
+                self._discard_executor(executor)
+                return ""
+            except BrokenProcessPool:
+                logger.error("PDF extraction worker died, replacing extraction pool")
+                self._discard_executor(executor)
+                return ""
+
+        if stop_reason:
+            logger.warning(
+                f"PDF extraction stopped early ({stop_reason}) after {pages_read} pages "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+        return text
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor, self._pids = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_extraction_engine():
+    """Return the process-wide engine, or None when isolated extraction is disabled."""
+    global _engine
+
+    if not settings.RESUME_EXTRACTION_WORKERS:
+        return None
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = ExtractionEngine(
+                max_workers=settings.RESUME_EXTRACTION_WORKERS,
+                max_pages=settings.RESUME_EXTRACTION_MAX_PAGES,
+                timeout=settings.RESUME_EXTRACTION_TIMEOUT,
+                cpu_seconds=settings.RESUME_EXTRACTION_CPU_SECONDS,
+                memory_limit_mb=settings.RESUME_EXTRACTION_MEMORY_MB,
+                max_tasks_per_child=settings.RESUME_EXTRACTION_MAX_TASKS_PER_CHILD,
+            )
+            atexit.register(_engine.shutdown)
+    return _engine
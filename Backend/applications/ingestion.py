@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.async_views import database_slot
+from jobs.models import Job
+from .models import Application, ResumeDocument, ResumeIngestion
+from .scoring import score_application
+from .services import extract_resume_text
+from .rescoring import claim_next_rescore, process_rescore
+from .stats import add_daily, add_score
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+def store_resume(file_path, resume):
+    """Upload the resume file to storage and return its public URL."""
+    storage = get_storage()
+    try:
+        resume.seek(0)
+        storage.upload(file_path, resume)
+    except Exception as upload_error:
+        logger.error(f"Resume upload error details: {type(upload_error).__name__} - {str(upload_error)}")
+        raise
+
+    return storage.public_url(file_path)
+
+
+async def astore_resume(file_path, resume):
+    """`store_resume` for async views; the upload runs on the loop's pooled client."""
+    storage = get_storage()
+    try:
+        resume.seek(0)
+        await storage.aupload(file_path, resume)
+    except Exception as upload_error:
+        logger.error(f"Resume upload error details: {type(upload_error).__name__} - {str(upload_error)}")
+        raise
+
+    return storage.public_url(file_path)
+
+
+def hash_resume(resume):
+    """SHA-256 of an uploaded file, computed chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in resume.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_path(sha256):
+    return f"documents/{sha256[:2]}/{sha256}.pdf"
+
+
+def resume_source(resume):
+    """
+    What PDF extraction reads: the path of an upload spooled to disk, so
+    its contents are not loaded here, or the bytes of a small in-memory one.
+    """
+    if hasattr(resume, "temporary_file_path"):
+        return resume.temporary_file_path()
+    resume.seek(0)
+    return resume.read()
+
+
+def extract_resume(resume):
+    return extract_resume_text(resume_source(resume))
+
+
+def find_document(sha256):
+    return ResumeDocument.objects.filter(sha256=sha256).defer('search_vector').first()
+
+
+def create_document(sha256, resume):
+    """
+    Extract, upload and record a resume that has not been seen before.
+    `resume` is a Django File, typically the request's uploaded file; it is
+    streamed to storage in chunks rather than read whole.
+    """
+    extracted_text = extract_resume(resume)
+    file_path = document_path(sha256)
+    public_url = store_resume(file_path, resume)
+
+    document, _ = ResumeDocument.objects.get_or_create(
+        sha256=sha256,
+        defaults={
+            'storage_path': file_path,
+            'public_url': public_url,
+            'size': resume.size,
+            'extracted_text': extracted_text,
+        },
+    )
+    return document
+
+
+async def acreate_document(sha256, resume):
+    """`create_document` for async views; only the upload runs on the event loop."""
+    extracted_text = await sync_to_async(extract_resume, thread_sensitive=False)(resume)
+    file_path = document_path(sha256)
+    public_url = await astore_resume(file_path, resume)
+
+    async with database_slot():
+        document, _ = await ResumeDocument.objects.aget_or_create(
+            sha256=sha256,
+            defaults={
+                'storage_path': file_path,
+                'public_url': public_url,
+                'size': resume.size,
+                'extracted_text': extracted_text,
+            },
+        )
+    return document
+
+
+ALREADY_APPLIED = "Already applied to this job"
+
+
+def check_application(user, job_id, resume):
+    """
+    The active job `user` is applying to with `resume`, as (job, None, None),
+    or (None, error message, status code) when the application is refused.
+    """
+    try:
+        job = Job.objects.get(job_id=job_id, is_active=True)
+    except Job.DoesNotExist:
+        return None, "Job not found or inactive", 404
+
+    if not resume:
+        return None, "Resume file is required", 400
+
+    if Application.objects.filter(user=user, job=job).exists():
+        return None, ALREADY_APPLIED, 400
+
+    return job, None, None
+
+
+def start_application(user, job, sha256, resume):
+    """
+    Look up an already processed copy of the resume hashed to `sha256`. In
+    async ingestion mode a resume not seen before is queued at once.
+    Returns (document, queued application), either of which may be None;
+    raises IntegrityError when the user applied in the meantime.
+    """
+    document = find_document(sha256)
+    if document is None and settings.RESUME_INGESTION_MODE == "async":
+        return None, enqueue_application(user, job, resume)
+    return document, None
+
+
+def queued_data(application):
+    return {
+        "message": "Application received and is being processed",
+        "status": application.status,
+        "application_id": application.id
+    }
+
+
+def submitted_data(application):
+    return {
+        "message": "Application submitted successfully",
+        "match_score": application.match_score,
+        "resume_url": application.resume_file,
+        "application_id": application.id
+    }
+
+
+def apply_with_document(user, job, document):
+    """Create a completed application that reuses an already processed resume."""
+    return Application.objects.create(
+        user=user,
+        job=job,
+        document=document,
+        resume_file=document.public_url,
+        match_score=score_application(job, document.extracted_text),
+    )
+
+
+def enqueue_application(user, job, resume):
+    """Persist the raw upload with a pending application and return the application."""
+    resume.seek(0)
+
+    with transaction.atomic():
+        application = Application.objects.create(
+            user=user,
+            job=job,
+            status=Application.STATUS_PENDING,
+        )
+        ResumeIngestion.objects.create(
+            application=application,
+            file_name=resume.name,
+            payload=resume.read(),
+        )
+
+    return application
+
+
+def claim_next():
+    """Lock the next due ingestion for this worker, or return None when the queue is empty."""
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.RESUME_INGESTION_LEASE_SECONDS)
+
+    with transaction.atomic():
+        task = (
+            ResumeIngestion.objects
+            .select_for_update(skip_locked=True)
+            .filter(application__status=Application.STATUS_PENDING, available_at__lte=now)
+            .filter(Q(locked_at__isnull=True) | Q(locked_at__lt=stale_before))
+            .order_by('available_at')
+            .first()
+        )
+        if task is None:
+            return None
+
+        task.locked_at = now
+        task.attempts += 1
+        task.save(update_fields=['locked_at', 'attempts'])
+
+    return task
+
+
+def process_ingestion(task):
+    """
+    Run extraction, scoring and upload for a claimed ingestion. Any failure
+    is logged and schedules a retry; returns whether the task completed.
+    """
+    try:
+        application = Application.objects.select_related('job').get(pk=task.application_id)
+        job = application.job
+
+        resume = ContentFile(bytes(task.payload), name=task.file_name)
+        sha256 = hash_resume(resume)
+        document = find_document(sha256) or create_document(sha256, resume)
+
+        with transaction.atomic():
+            application.document = document
+            application.resume_file = document.public_url
+            application.match_score = score_application(job, document.extracted_text)
+            application.status = Application.STATUS_COMPLETED
+            application.save(update_fields=['document', 'resume_file', 'match_score', 'status', 'updated_at'])
+            add_score(job.pk, application.match_score)
+            add_daily(job.pk, application.applied_at, applications=0, score=application.match_score)
+            task.delete()
+    except Exception as e:
+        logger.exception(f"Ingestion of application {task.application_id} failed (attempt {task.attempts})")
+        _schedule_retry(task, e)
+        return False
+
+    return True
+
+
+def _schedule_retry(task, error):
+    task.last_error = f"{type(error).__name__}: {error}"
+    task.locked_at = None
+
+    if task.attempts >= settings.RESUME_INGESTION_MAX_ATTEMPTS:
+        with transaction.atomic():
+            task.save(update_fields=['last_error', 'locked_at'])
+            Application.objects.filter(pk=task.application_id).update(
+                status=Application.STATUS_FAILED, updated_at=timezone.now(),
+            )
+        return
+
+    delay = settings.RESUME_INGESTION_RETRY_DELAY * 2 ** (task.attempts - 1)
+    task.available_at = timezone.now() + timedelta(seconds=delay)
+    task.save(update_fields=['last_error', 'locked_at', 'available_at'])
+
+
+def run_worker(stop_event, poll_interval=2, once=False):
+    """
+    Process ingestions, then pending job rescores, until the queues drain
+    (``once``) or ``stop_event`` is set.
+    """
+    processed = 0
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            task = claim_next()
+            if task is not None:
+                process_ingestion(task)
+                processed += 1
+                continue
+
+            rescore = claim_next_rescore()
+            if rescore is not None:
+                try:
+                    process_rescore(rescore)
+                except Exception:
+                    # Left claimed; another worker takes it over once the lease expires
+                    logger.exception(f"Rescore of job {rescore.job_id} failed")
+                processed += 1
+                continue
+
+            if once:
+                break
+            stop_event.wait(poll_interval)
+    finally:
+        connection.close()
+
+    return processed
+
+
+def run_worker_pool(workers=4, poll_interval=2, once=False):
+    """Run ``workers`` worker threads and block until they exit."""
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(stop_event, poll_interval, once),
+            name=f"resume-ingestion-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        logger.info("Stopping resume ingestion workers")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
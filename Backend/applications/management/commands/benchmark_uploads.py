@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import statistics
+import time
+import uuid
+
+import httpx
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import CustomUser
+from applications.models import ResumeDocument
+from core.synthetic import make_pdf
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent resume uploads at a running server and report throughput and latency. "
+        "Creates throwaway users and a job in the server's database and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server")
+        parser.add_argument("--requests", type=int, default=200, help="Number of uploads")
+        parser.add_argument("--concurrency", type=int, default=50, help="Uploads in flight at once")
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        count = options["requests"]
+
+        recruiter = CustomUser.objects.create(username=f"bench-{run_id}-recruiter", role="recruiter")
+        job = Job.objects.create(
+            created_by=recruiter,
+            title="Benchmark",
+            description="Benchmark job",
+            company_name="Benchmark",
+            location="Remote",
+            experience_required="0",
+            keywords=["python", "django"],
+        )
+        applicants = CustomUser.objects.bulk_create(
+            CustomUser(username=f"bench-{run_id}-{i}", role="applicant") for i in range(count)
+        )
+        # Distinct files, so no upload is answered from an already stored document
+        pdfs = [make_pdf(f"python django benchmark {run_id} {i}") for i in range(count)]
+        tokens = [str(RefreshToken.for_user(user).access_token) for user in applicants]
+
+        try:
+            elapsed, latencies, statuses = asyncio.run(
+                self._run(options["url"], job.job_id, tokens, pdfs, options["concurrency"])
+            )
+        finally:
+            shas = [hashlib.sha256(pdf).hexdigest() for pdf in pdfs]
+            ResumeDocument.objects.filter(sha256__in=shas).delete()
+            CustomUser.objects.filter(username__startswith=f"bench-{run_id}-").delete()
+
+        latencies.sort()
+        self.stdout.write(f"{count} uploads, concurrency {options['concurrency']}: {elapsed:.2f}s")
+        self.stdout.write(f"  throughput  {count / elapsed:.1f} req/s")
+        self.stdout.write(
+            f"  latency     p50 {statistics.median(latencies) * 1000:.0f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms, "
+            f"max {latencies[-1] * 1000:.0f} ms"
+        )
+        self.stdout.write(f"  statuses    {dict(sorted(statuses.items()))}")
+
+    async def _run(self, url, job_id, tokens, pdfs, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = {}
+
+        async def upload(client, token, pdf):
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        f"{url}/applications/{job_id}/apply/",
+                        headers={"Authorization": f"Bearer {token}"},
+                        files={"resume": ("resume.pdf", pdf, "application/pdf")},
+                    )
+                    outcome = str(response.status_code)
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(upload(client, token, pdf) for token, pdf in zip(tokens, pdfs)))
+            return time.perf_counter() - started, latencies, statuses
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from applications.ingestion import run_worker_pool
+
+
+class Command(BaseCommand):
+    help = "Run the resume ingestion worker pool for applications accepted in async mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Number of worker threads")
+        parser.add_argument("--poll-interval", type=float, default=2, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting {options['workers']} resume ingestion workers")
+        run_worker_pool(
+            workers=options["workers"],
+            poll_interval=options["poll_interval"],
+            once=options["once"],
+        )
+        self.stdout.write(self.style.SUCCESS("Resume ingestion workers stopped"))
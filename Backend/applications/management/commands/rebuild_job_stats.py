@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from applications.stats import rebuild_job_stats
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-job match score rollups (JobStats) from the applications table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("job_ids", nargs="*", help="Job UUIDs to rebuild; every job when omitted")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options["job_ids"]:
+            jobs = jobs.filter(job_id__in=options["job_ids"])
+
+        batch = []
+        rebuilt = 0
+        for pk in jobs.values_list("pk", flat=True).iterator(chunk_size=options["batch_size"]):
+            batch.append(pk)
+            if len(batch) >= options["batch_size"]:
+                rebuilt += rebuild_job_stats(batch)
+                batch = []
+        if batch:
+            rebuilt += rebuild_job_stats(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats of {rebuilt} jobs"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.rescoring import rescore_job_applications
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Recompute match scores of a job's applications from their stored resume text"
+
+    def add_arguments(self, parser):
+        parser.add_argument("job_ids", nargs="*", help="Job UUIDs to rescore")
+        parser.add_argument("--all", action="store_true", help="Rescore every job")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            jobs = Job.objects.all()
+        elif options["job_ids"]:
+            jobs = Job.objects.filter(job_id__in=options["job_ids"])
+        else:
+            raise CommandError("Pass one or more job ids, or --all")
+
+        for job in jobs.iterator():
+            changed = rescore_job_applications(
+                job,
+                batch_size=options["batch_size"],
+                progress=lambda done, total: self.stdout.write(f"  {job.job_id}: {done}/{total}"),
+            )
+            self.stdout.write(self.style.SUCCESS(f"{job.title} ({job.job_id}): {changed} scores changed"))
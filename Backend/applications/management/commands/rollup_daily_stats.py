@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from applications.stats import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-job daily application rollups (JobDailyStats) from the applications table: "
+        "the last few days by default, to catch up after bulk writes, or everything with --all"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Days to rebuild, today included (default 2)")
+        parser.add_argument("--since", help="Rebuild from this date (YYYY-MM-DD) on instead")
+        parser.add_argument("--all", action="store_true", help="Rebuild every day, e.g. to backfill")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            since = None
+        elif options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError(f"--since must be a date as YYYY-MM-DD, not '{options['since']}'")
+        elif options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        else:
+            since = timezone.localdate() - timedelta(days=options["days"] - 1)
+
+        written = rebuild_daily_stats(since)
+        scope = f"since {since}" if since else "for every day"
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily rows {scope}"))
@@ -0,0 +1,95 @@
+"""
+Compiled keyword matching.
+
+Keyword lists are compiled once into an inverted index: single-word keywords
+are looked up with one set intersection against the resume's words, and
+multi-word keywords are only searched for (as whole, consecutive words) when
+every one of their words occurs in the resume. A matcher can hold the keyword
+lists of many jobs and score a resume against all of them in one pass.
+"""
+from collections import Counter
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    """Inverted index over one or more keyword lists, keyed by e.g. job id."""
+
+    def __init__(self, keyword_lists):
+        self._sizes = {}
+        # word -> [(list key, keyword index)]
+        self._words = {}
+        # " multi word phrase " -> (frozenset of its words, [(list key, keyword index)])
+        self._phrases = {}
+
+        for key, keywords in keyword_lists.items():
+            self._sizes[key] = len(keywords)
+            for index, keyword in enumerate(keywords):
+                tokens = keyword.lower().split()
+                if len(tokens) == 1:
+                    self._words.setdefault(tokens[0], []).append((key, index))
+                elif tokens:
+                    phrase = f" {' '.join(tokens)} "
+                    entry = self._phrases.setdefault(phrase, (frozenset(tokens), []))
+                    entry[1].append((key, index))
+
+        self._word_set = frozenset(self._words)
+
+    @classmethod
+    def for_keywords(cls, keywords):
+        return cls({None: keywords})
+
+    def find(self, text):
+        """Return the set of (list key, keyword index) pairs present in the cleaned `text`."""
+        found = set()
+        words = set(text.split())
+
+        for word in self._word_set.intersection(words):
+            found.update(self._words[word])
+
+        if self._phrases:
+            padded = None
+            for phrase, (phrase_words, terminals) in self._phrases.items():
+                if phrase_words <= words:
+                    if padded is None:
+                        # cleaned text is single-spaced, so padding gives word boundaries
+                        padded = f" {text} "
+                    if phrase in padded:
+                        found.update(terminals)
+
+        return found
+
+    def scores(self, text):
+        """Match score (0-100) of `text` against every keyword list, in one pass."""
+        matched = Counter(key for key, _ in self.find(text))
+        return {key: self._percent(matched[key], size) for key, size in self._sizes.items()}
+
+    def score(self, text, key=None):
+        """Match score of `text` against a single keyword list."""
+        matched = sum(1 for found_key, _ in self.find(text) if found_key == key)
+        return self._percent(matched, self._sizes[key])
+
+    def score_many(self, texts, key=None):
+        """Scores of many resumes against one keyword list."""
+        return [self.score(text, key) for text in texts]
+
+    @staticmethod
+    def _percent(matched, size):
+        if not size:
+            return 0
+        return round((matched / size) * 100, 2)
+
+
+@lru_cache(maxsize=1024)
+def _compile(keywords):
+    return KeywordMatcher.for_keywords(keywords)
+
+
+def compile_keywords(keywords):
+    """
+    Matcher for one keyword list, cached on the list's contents.
+
+    Because the cache key is the keywords themselves, editing `Job.keywords`
+    naturally picks up a freshly compiled matcher and jobs sharing a keyword
+    list share one matcher.
+    """
+    return _compile(tuple(keywords))
@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-18 11:33
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def attach_legacy_documents(apps, schema_editor):
+    """
+    Give every processed application a document of its own. The original
+    file bytes are not at hand, so these rows are keyed on the application
+    rather than on content and are never shared.
+    """
+    Application = apps.get_model('applications', 'Application')
+    ResumeDocument = apps.get_model('applications', 'ResumeDocument')
+
+    legacy = (
+        Application.objects
+        .filter(document__isnull=True, status='completed')
+        .only('id', 'resume_file', 'extracted_text')
+    )
+    for application in legacy.iterator(chunk_size=500):
+        key = hashlib.sha256(f"legacy-application:{application.id}".encode()).hexdigest()
+        document, _ = ResumeDocument.objects.get_or_create(
+            sha256=key,
+            defaults={
+                'public_url': application.resume_file,
+                'extracted_text': application.extracted_text,
+            },
+        )
+        Application.objects.filter(pk=application.pk).update(document=document)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_application_status_resumeingestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('storage_path', models.CharField(blank=True, max_length=255)),
+                ('public_url', models.URLField(blank=True, null=True)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('extracted_text', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applications', to='applications.resumedocument'),
+        ),
+        migrations.RunPython(attach_legacy_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 11:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_jobrescore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedocument',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('extracted_text', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='resumedocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resume_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 11:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_resumedocument_search_vector'),
+        ('jobs', '0005_job_scoring_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCorpusStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('total_length', models.BigIntegerField(default=0)),
+                ('doc_freq', models.JSONField(default=dict)),
+                ('scored_documents', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='corpus_stats', to='jobs.job')),
+            ],
+        ),
+    ]
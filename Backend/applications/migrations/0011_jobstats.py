@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-18 14:25
+
+import applications.models
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Rollups of the jobs that already have applications; jobs without a row
+# get one with their first processed application
+BANDS = ", ".join(
+    f"count(*) FILTER (WHERE a.status = 'completed' AND LEAST(GREATEST(floor(a.match_score / 10)::int, 0), 9) = {band})"
+    for band in range(10)
+)
+BACKFILL = (
+    "INSERT INTO applications_jobstats (job_id, scored, score_sum, max_score, histogram, updated_at) "
+    "SELECT a.job_id, "
+    "count(*) FILTER (WHERE a.status = 'completed'), "
+    "coalesce(sum(a.match_score) FILTER (WHERE a.status = 'completed'), 0), "
+    "max(a.match_score) FILTER (WHERE a.status = 'completed'), "
+    f"ARRAY[{BANDS}], now() "
+    "FROM applications_application a GROUP BY a.job_id"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0010_application_updated_at'),
+        ('jobs', '0006_job_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scored', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('max_score', models.FloatField(blank=True, null=True)),
+                ('histogram', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=applications.models.empty_histogram, size=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='jobs.job')),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+import applications.models
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+BANDS = ", ".join(
+    f"count(*) FILTER (WHERE a.status = 'completed' AND LEAST(GREATEST(floor(a.match_score / 10)::int, 0), 9) = {band})"
+    for band in range(10)
+)
+BACKFILL = (
+    "INSERT INTO applications_jobdailystats (job_id, day, applications, scored, score_sum, histogram) "
+    "SELECT a.job_id, (a.applied_at AT TIME ZONE %s)::date, count(*), "
+    "count(*) FILTER (WHERE a.status = 'completed'), "
+    "coalesce(sum(a.match_score) FILTER (WHERE a.status = 'completed'), 0), "
+    f"ARRAY[{BANDS}] "
+    "FROM applications_application a GROUP BY 1, 2"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0011_jobstats'),
+        ('jobs', '0006_job_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('applications', models.PositiveIntegerField(default=0)),
+                ('scored', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('histogram', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=applications.models.empty_histogram, size=10)),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.job')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'day'), name='job_daily_stats_unique')],
+            },
+        ),
+        migrations.RunSQL([(BACKFILL, [settings.TIME_ZONE])], migrations.RunSQL.noop),
+    ]
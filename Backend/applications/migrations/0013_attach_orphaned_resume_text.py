@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 15:40
+
+import hashlib
+
+from django.db import migrations
+
+
+def attach_orphaned_text(apps, schema_editor):
+    """
+    Keep the text of applications that have none in a document, e.g. those
+    whose document was deleted, in a document of their own as 0004 did.
+    """
+    Application = apps.get_model('applications', 'Application')
+    ResumeDocument = apps.get_model('applications', 'ResumeDocument')
+
+    orphaned = (
+        Application.objects
+        .filter(document__isnull=True)
+        .exclude(extracted_text='')
+        .only('id', 'resume_file', 'extracted_text')
+    )
+    for application in orphaned.iterator(chunk_size=500):
+        key = hashlib.sha256(f"legacy-application:{application.id}".encode()).hexdigest()
+        document, _ = ResumeDocument.objects.get_or_create(
+            sha256=key,
+            defaults={
+                'public_url': application.resume_file,
+                'extracted_text': application.extracted_text,
+            },
+        )
+        Application.objects.filter(pk=application.pk).update(document=document)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0012_jobdailystats'),
+    ]
+
+    operations = [
+        migrations.RunPython(attach_orphaned_text, migrations.RunPython.noop),
+    ]
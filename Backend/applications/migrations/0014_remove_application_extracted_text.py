@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 15:41
+
+from django.db import migrations
+
+
+# Resume text is kept out of line and compressed once past the TOAST
+# threshold; use lz4 where the server has it, pglz (the default) otherwise
+COMPRESS_TEXT = """
+DO $$
+BEGIN
+    ALTER TABLE applications_resumedocument ALTER COLUMN extracted_text SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    NULL;
+END
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0013_attach_orphaned_resume_text'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='application',
+            name='extracted_text',
+        ),
+        migrations.RunSQL(
+            COMPRESS_TEXT,
+            "ALTER TABLE applications_resumedocument ALTER COLUMN extracted_text SET COMPRESSION DEFAULT",
+        ),
+    ]
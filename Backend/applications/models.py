@@ -1,20 +1,163 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from jobs.models import Job
+from django.utils import timezone
+from jobs.models import Job, SEARCH_CONFIG
 from django.conf import settings
 # Create your models here.
 
+class ResumeDocument(models.Model):
+    """A resume stored once per distinct file content and shared by every application that uploads it."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    storage_path = models.CharField(max_length=255, blank=True)
+    public_url = models.URLField(blank=True, null=True)
+    size = models.PositiveIntegerField(default=0)
+    # The only copy of a resume's text; applications reach it through `document`
+    extracted_text = models.TextField(blank=True)
+    search_vector = models.GeneratedField(
+        expression=SearchVector('extracted_text', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='resume_search_vector_idx'),
+        ]
+
+    def __str__(self):
+        return self.sha256
+
+
 class Application(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUSES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    # Indexed by application_user_applied_idx and the (user, job) unique constraint
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     
+    document = models.ForeignKey(
+        ResumeDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='applications'
+    )
     resume_file = models.URLField(blank=True, null=True)  # Cloudinary URL for resume
-    extracted_text = models.TextField(blank=True)
     match_score = models.FloatField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_COMPLETED)
 
     applied_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'job')  # prevent multople apply to single job by single user 
+        indexes = [
+            # Serves a job's applicants best match first, page by page
+            models.Index(fields=['job', '-match_score', 'id'], name='application_job_score_idx'),
+            # Applicant's own applications, most recent first
+            models.Index(fields=['user', '-applied_at'], name='application_user_applied_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} → {self.job.title}"
+
+
+class ResumeIngestion(models.Model):
+    """Raw upload waiting to be parsed, scored and stored by the ingestion workers."""
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name='ingestion')
+    file_name = models.CharField(max_length=255)
+    payload = models.BinaryField()
+
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Ingestion for application {self.application_id}"
+
+
+class JobRescore(models.Model):
+    """Re-score of a job's applications requested after its keywords changed."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='rescore')
+
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    requested_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Rescore of job {self.job_id} ({self.processed}/{self.total})"
+
+
+class JobCorpusStats(models.Model):
+    """Corpus statistics over a job's processed resumes, used by the BM25 and TF-IDF scoring modes."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='corpus_stats')
+
+    documents = models.PositiveIntegerField(default=0)
+    total_length = models.BigIntegerField(default=0)  # words across all documents
+    doc_freq = models.JSONField(default=dict)  # normalized keyword -> documents containing it
+    scored_documents = models.PositiveIntegerField(default=0)  # pool size at the last full rescore
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Corpus stats for job {self.job_id} ({self.documents} documents)"
+
+
+def empty_histogram():
+    return [0] * JobStats.SCORE_BUCKETS
+
+
+class JobStats(models.Model):
+    """Match score rollup of a job's processed applications, read by the recruiter dashboard."""
+    SCORE_BUCKETS = 10  # 10-point bands; a score of 100 counts in the last one
+
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='stats')
+
+    scored = models.PositiveIntegerField(default=0)  # completed applications
+    score_sum = models.FloatField(default=0)
+    max_score = models.FloatField(null=True, blank=True)
+    histogram = ArrayField(models.IntegerField(), size=SCORE_BUCKETS, default=empty_histogram)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for job {self.job_id} ({self.scored} scored)"
+
+
+class JobDailyStats(models.Model):
+    """
+    A job's applications for one day of `applied_at`, in TIME_ZONE, and the
+    match scores of those among them that were processed. Read by the
+    dashboard time series.
+    """
+    # Covered by job_daily_stats_unique, which also serves date ranges of a job
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='daily_stats', db_index=False)
+    day = models.DateField()
+
+    applications = models.PositiveIntegerField(default=0)
+    scored = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    histogram = ArrayField(models.IntegerField(), size=JobStats.SCORE_BUCKETS, default=empty_histogram)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day'], name='job_daily_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"Stats for job {self.job_id} on {self.day} ({self.applications} applications)"
@@ -0,0 +1,211 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, TextField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from jobs.models import Job
+from .models import Application, JobCorpusStats, JobRescore
+from .scoring import score_pool
+from .services import compute_match_score
+from .stats import rebuild_job_stats
+
+logger = logging.getLogger(__name__)
+
+
+def rescore_job_applications(job, batch_size=500, progress=None):
+    """
+    Recompute `match_score` for every processed application of `job` from its
+    document's extracted text, then rebuild the job's score rollup.
+
+    Applications are streamed with a server-side cursor and written back one
+    batch at a time, each batch in its own short transaction.
+    `progress(processed, total)` is called after every batch. Returns the
+    number of applications whose score changed.
+    """
+    applications = (
+        Application.objects
+        .filter(job=job, status=Application.STATUS_COMPLETED)
+        .only('id', 'match_score')
+        # The text lives with the shared document; read it in the same query
+        .annotate(resume_text=Coalesce('document__extracted_text', Value(''), output_field=TextField()))
+        .order_by('id')
+    )
+    total = applications.count()
+
+    if job.scoring_mode != Job.SCORING_COVERAGE:
+        changed = _rescore_weighted(job, applications, total, batch_size, progress)
+        rebuild_job_stats([job.pk])
+        return changed
+    processed = 0
+    changed = 0
+    batch = []
+
+    for application in applications.iterator(chunk_size=batch_size):
+        score = compute_match_score(application.resume_text, job.keywords)
+        if score != application.match_score:
+            application.match_score = score
+            batch.append(application)
+        processed += 1
+
+        if processed % batch_size == 0:
+            changed += _flush(batch)
+            batch = []
+            if progress:
+                progress(processed, total)
+
+    changed += _flush(batch)
+    if progress:
+        progress(processed, total)
+
+    rebuild_job_stats([job.pk])
+    return changed
+
+
+def _rescore_weighted(job, applications, total, batch_size, progress):
+    """
+    BM25 / TF-IDF scores depend on the whole pool, so the texts are read in
+    one pass, scored together with fresh corpus statistics, then written back.
+    """
+    ids = []
+    previous = []
+    texts = []
+    for application in applications.iterator(chunk_size=batch_size):
+        ids.append(application.id)
+        previous.append(application.match_score)
+        texts.append(application.resume_text)
+
+    scores, stats = score_pool(job, texts)
+    del texts
+    JobCorpusStats.objects.update_or_create(job=job, defaults=stats)
+
+    changed = 0
+    batch = []
+    for processed, (pk, old, score) in enumerate(zip(ids, previous, scores), start=1):
+        if score != old:
+            batch.append(Application(id=pk, match_score=score))
+        if processed % batch_size == 0:
+            changed += _flush(batch)
+            batch = []
+            if progress:
+                progress(processed, total)
+
+    changed += _flush(batch)
+    if progress:
+        progress(len(ids), total)
+
+    return changed
+
+
+def _flush(batch):
+    # One UPDATE joined against the batch as arrays; bulk_update's per-row
+    # CASE expression costs several times more on large pools
+    if batch:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Application._meta.db_table} AS a SET match_score = v.score, updated_at = now() "
+                "FROM unnest(%s::bigint[], %s::double precision[]) AS v(id, score) "
+                "WHERE a.id = v.id",
+                [[application.id for application in batch], [application.match_score for application in batch]],
+            )
+    return len(batch)
+
+
+def request_rescore(job):
+    """
+    Record that `job`'s scores are stale. Repeated requests collapse into one
+    pending rescore, which the process_resumes workers pick up; in sync
+    ingestion mode, where no worker may be running, a background thread
+    starts on it once the request's transaction commits. The request itself
+    never rescores.
+    """
+    JobRescore.objects.update_or_create(job=job, defaults={'requested_at': timezone.now()})
+
+    if settings.RESUME_INGESTION_MODE != "async":
+        job_id = job.pk
+        transaction.on_commit(lambda: start_background_rescore(job_id))
+
+
+def start_background_rescore(job_id):
+    """Run the job's pending rescore on a thread of its own and return the thread."""
+    def run():
+        try:
+            run_rescore(job_id)
+        except Exception:
+            logger.exception(f"Background rescore of job {job_id} failed")
+            # Release the claim so the job's next edit starts a rescore again
+            JobRescore.objects.filter(job_id=job_id).update(started_at=None)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run, name=f"rescore-job-{job_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def claim_next_rescore():
+    """Lock the oldest pending rescore for this worker, or return None."""
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.RESUME_INGESTION_LEASE_SECONDS)
+
+    with transaction.atomic():
+        rescore = (
+            JobRescore.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(started_at__isnull=True) | Q(started_at__lt=stale_before))
+            .order_by('requested_at')
+            .first()
+        )
+        if rescore is None:
+            return None
+
+        rescore.started_at = now
+        rescore.processed = 0
+        rescore.save(update_fields=['started_at', 'processed'])
+
+    return rescore
+
+
+def run_rescore(job_id):
+    """
+    Run the pending rescore for a job if no other worker holds it. A claim
+    older than the lease is taken over, as its thread or process died.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.RESUME_INGESTION_LEASE_SECONDS)
+
+    with transaction.atomic():
+        rescore = (
+            JobRescore.objects
+            .select_for_update(skip_locked=True)
+            .filter(job_id=job_id)
+            .filter(Q(started_at__isnull=True) | Q(started_at__lt=stale_before))
+            .first()
+        )
+        if rescore is None:
+            return
+        rescore.started_at = timezone.now()
+        rescore.save(update_fields=['started_at'])
+
+    process_rescore(rescore)
+
+
+def process_rescore(rescore):
+    job = rescore.job
+
+    def report(processed, total):
+        JobRescore.objects.filter(pk=rescore.pk).update(processed=processed, total=total)
+        logger.info(f"Rescoring job {job.job_id}: {processed}/{total} applications")
+
+    changed = rescore_job_applications(job, progress=report)
+    logger.info(f"Rescored job {job.job_id}: {changed} scores changed")
+
+    # Keywords edited again while we ran: leave the row for another pass
+    finished = JobRescore.objects.filter(pk=rescore.pk, requested_at__lte=rescore.started_at).delete()[0]
+    if not finished:
+        JobRescore.objects.filter(pk=rescore.pk).update(started_at=None)
+        if settings.RESUME_INGESTION_MODE != "async":
+            run_rescore(job.pk)
@@ -0,0 +1,175 @@
+"""
+Frequency-weighted match scoring.
+
+Besides plain keyword coverage (`compute_match_score`), a job can rank its
+applicants with BM25 or TF-IDF. Both weigh keywords by how rare they are
+among the job's own applicants and count how often each keyword appears,
+using per-job corpus statistics (`JobCorpusStats`). Scores are normalized to
+0-100 so they live in the same `match_score` column as coverage scores.
+
+Keyword occurrences follow the same rules as coverage matching: whole words,
+and multi-word keywords as consecutive words of the cleaned text.
+"""
+import math
+
+import numpy as np
+from django.db import transaction
+
+from jobs.models import Job
+from .models import JobCorpusStats
+from .services import compute_match_score
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rescore a job's pool once it has grown by this share since the last full
+# pass, so earlier scores catch up with the corpus statistics.
+RESCORE_DRIFT = 0.1
+
+
+def keyword_terms(keywords):
+    return [" ".join(keyword.lower().split()) for keyword in keywords]
+
+
+def _patterns(terms):
+    # Matched against text whose spaces are doubled, so back-to-back
+    # occurrences each keep a space on both sides and are all counted
+    return [f" {'  '.join(term.split())} " if term else None for term in terms]
+
+
+def term_frequencies(texts, terms):
+    """
+    Return (tf, lengths): an (n texts x n terms) array of occurrence counts
+    and the word count of each cleaned text.
+    """
+    patterns = _patterns(terms)
+    tf = np.zeros((len(texts), len(terms)), dtype=np.float64)
+    lengths = np.zeros(len(texts), dtype=np.float64)
+
+    for row, text in enumerate(texts):
+        if not text:
+            continue
+        lengths[row] = text.count(" ") + 1
+        spaced = f"  {text.replace(' ', '  ')}  "
+        for column, pattern in enumerate(patterns):
+            if pattern is not None:
+                tf[row, column] = spaced.count(pattern)
+
+    return tf, lengths
+
+
+def bm25_scores(tf, lengths, doc_freq, documents, average_length):
+    """BM25 of each row of `tf`, as a percentage of the best score the job's keywords allow."""
+    idf = np.log1p((documents - doc_freq + 0.5) / (doc_freq + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(average_length, 1.0))
+    saturated = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+
+    best = (idf * (BM25_K1 + 1)).sum()
+    if not best:
+        return np.zeros(len(tf))
+    return saturated @ idf / best * 100
+
+
+def tfidf_scores(tf, doc_freq, documents):
+    """Cosine similarity (as a percentage) of each row's TF-IDF vector with the job's keyword weights."""
+    idf = np.log((1 + documents) / (1 + doc_freq)) + 1
+    weights = np.zeros_like(tf)
+    present = tf > 0
+    weights[present] = 1 + np.log(tf[present])
+    weights *= idf
+
+    norms = np.linalg.norm(weights, axis=1) * np.linalg.norm(idf)
+    dots = weights @ idf
+    return np.divide(dots, norms, out=np.zeros(len(tf)), where=norms > 0) * 100
+
+
+def weighted_scores(mode, tf, lengths, doc_freq, documents, total_length):
+    if not documents:
+        return np.zeros(len(tf))
+    if mode == Job.SCORING_BM25:
+        return bm25_scores(tf, lengths, doc_freq, documents, total_length / documents)
+    return tfidf_scores(tf, doc_freq, documents)
+
+
+def _round(scores):
+    return [round(float(score), 2) for score in scores]
+
+
+def score_pool(job, texts):
+    """
+    Score every resume of a job's pool in one vectorized pass, computing the
+    corpus statistics from the pool itself. Returns (scores, stats) where
+    stats holds the values to store on `JobCorpusStats`.
+    """
+    terms = keyword_terms(job.keywords)
+    tf, lengths = term_frequencies(texts, terms)
+    doc_freq = (tf > 0).sum(axis=0).astype(np.float64)
+    documents = len(texts)
+    total_length = int(lengths.sum())
+
+    scores = weighted_scores(job.scoring_mode, tf, lengths, doc_freq, documents, total_length)
+    stats = {
+        'documents': documents,
+        'total_length': total_length,
+        'doc_freq': {term: int(df) for term, df in zip(terms, doc_freq) if term},
+        'scored_documents': documents,
+    }
+    return _round(scores), stats
+
+
+def score_application(job, text):
+    """
+    Match score of a newly processed resume for `job`, in the job's scoring
+    mode. Weighted modes first add the resume to the job's corpus statistics
+    and request a pool rescore once those have drifted far enough.
+    """
+    if job.scoring_mode == Job.SCORING_COVERAGE or not job.keywords:
+        return compute_match_score(text, job.keywords)
+
+    terms = keyword_terms(job.keywords)
+    tf, lengths = term_frequencies([text], terms)
+
+    with transaction.atomic():
+        stats, _ = JobCorpusStats.objects.select_for_update().get_or_create(job=job)
+        stats.documents += 1
+        stats.total_length += int(lengths[0])
+        for term in {term for term, count in zip(terms, tf[0]) if term and count}:
+            stats.doc_freq[term] = stats.doc_freq.get(term, 0) + 1
+        stats.save()
+
+    doc_freq = np.array([stats.doc_freq.get(term, 0) for term in terms], dtype=np.float64)
+    score = weighted_scores(job.scoring_mode, tf, lengths, doc_freq, stats.documents, stats.total_length)[0]
+
+    drift = stats.documents - stats.scored_documents
+    if drift >= max(1, math.ceil(stats.scored_documents * RESCORE_DRIFT)):
+        from .rescoring import request_rescore
+        request_rescore(job)
+
+    return round(float(score), 2)
+
+
+def remove_from_corpus(job_id, keywords, texts):
+    """
+    Take deleted processed resumes back out of the job's corpus statistics,
+    undoing what `score_application` added for them.
+    """
+    terms = keyword_terms(keywords)
+    tf, lengths = term_frequencies(texts, terms)
+
+    with transaction.atomic():
+        stats = JobCorpusStats.objects.select_for_update().filter(job_id=job_id).first()
+        if stats is None:
+            return
+        stats.documents = max(stats.documents - len(texts), 0)
+        stats.total_length = max(stats.total_length - int(lengths.sum()), 0)
+        # Keyed by term, so a keyword listed twice is taken off once, as it was added
+        containing = {term: int(count) for term, count in zip(terms, (tf > 0).sum(axis=0)) if term and count}
+        for term, count in containing.items():
+            remaining = stats.doc_freq.get(term, 0) - count
+            if remaining > 0:
+                stats.doc_freq[term] = remaining
+            else:
+                stats.doc_freq.pop(term, None)
+        # A shrinking pool is no reason to rescore
+        stats.scored_documents = min(stats.scored_documents, stats.documents)
+        stats.save()
@@ -5,7 +5,7 @@ class ApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Application
         fields = '__all__'
-        read_only_fields = ['user' , 'job', 'match_score', 'extracted_text', 'applied_at']
+        read_only_fields = ['user' , 'job', 'match_score', 'status', 'applied_at']
 
 class ApplicationDetailSerializer(serializers.ModelSerializer):
     """Serializer that includes full job details for applicant's view"""
@@ -13,8 +13,8 @@ class ApplicationDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Application
-        fields = ['id', 'job', 'job_details', 'resume_file', 'match_score', 'applied_at']
-        read_only_fields = ['id', 'job', 'match_score', 'applied_at']
+        fields = ['id', 'job', 'job_details', 'resume_file', 'match_score', 'status', 'applied_at']
+        read_only_fields = ['id', 'job', 'match_score', 'status', 'applied_at']
     
     def get_job_details(self, obj):
         """Return detailed job information"""
@@ -51,6 +51,27 @@ class RecruiterApplicationSerializer(serializers.ModelSerializer):
             'id',
             'candidate',
             'match_score',
+            'status',
+            'resume_file',
+            'applied_at',
+        ]
+
+
+class CandidateSearchResultSerializer(serializers.ModelSerializer):
+    candidate = CandidateSummarySerializer(source='user', read_only=True)
+    job_id = serializers.UUIDField(source='job.job_id', read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Application
+        fields = [
+            'id',
+            'candidate',
+            'job_id',
+            'job_title',
+            'match_score',
+            'rank',
             'resume_file',
             'applied_at',
         ]
@@ -1,24 +1,27 @@
-from PyPDF2 import PdfReader
-import io
+import logging
 import re
 
-def extract_resume_text(file_bytes):
-    try:
-        
-        pdf_file = io.BytesIO(file_bytes)
-        pdf_reader = PdfReader(pdf_file)
-        text = ""
+from django.conf import settings
+
+from .extraction import get_extraction_engine, read_pdf_pages
+from .matching import compile_keywords
+
+logger = logging.getLogger(__name__)
 
-        for page in pdf_reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted
+
+def extract_resume_text(source):
+    """Cleaned text of a PDF given as bytes or as the path of a file."""
+    try:
+        engine = get_extraction_engine()
+        if engine is not None:
+            text = engine.extract(source)
+        else:
+            text, _, _ = read_pdf_pages(source, max_pages=settings.RESUME_EXTRACTION_MAX_PAGES)
 
         return clean_text(text)
 
     except Exception as e:
-        
-        print(f"PDF extract error: {e}")
+        logger.error(f"PDF extract error: {e}")
         return ""
 
 
@@ -37,19 +40,7 @@ def compute_match_score(text, keywords):
     if not keywords:
         return 0
 
-    # Convert text to a set of words for O(1) lookups and exact matching
-    # This prevents "Java" matching "Javascript"
-    text_words = set(text.split())
-    
-    match_count = 0
-    for kw in keywords:
-        kw_clean = kw.lower()
-        # Check if the exact keyword exists in the set of words
-        # OR check if multi-word keyword (e.g., "machine learning") is in the string
-        if " " in kw_clean:
-             if kw_clean in text:
-                 match_count += 1
-        elif kw_clean in text_words:
-            match_count += 1
-
-    return round((match_count / len(keywords)) * 100, 2)
\ No newline at end of file
+    # Compiled once per distinct keyword list and reused across calls.
+    # Single-word keywords match whole words only, so "Java" does not match
+    # "Javascript"; multi-word keywords match consecutive whole words.
+    return compile_keywords(keywords).score(text)
@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from jobs.models import Job
+from .models import Application, ResumeDocument
+from .scoring import remove_from_corpus
+from .stats import add_daily, add_score, rebuild_job_stats, remove_daily, remove_score
+
+
+@receiver(post_save, sender=Application)
+def increment_applicant_count(sender, instance, created, **kwargs):
+    if created:
+        Job.objects.filter(pk=instance.job_id).update(applicant_count=F('applicant_count') + 1)
+
+
+@receiver(post_save, sender=Application)
+def add_to_job_stats(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # The scores of applications queued for processing are added once processed
+    score = instance.match_score if instance.status == Application.STATUS_COMPLETED else None
+    add_daily(instance.job_id, instance.applied_at, score=score)
+    if score is not None:
+        add_score(instance.job_id, score)
+
+
+def _deleted_on_its_own(origin):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is None or origin_model is Application
+
+
+@receiver(post_delete, sender=Application)
+def decrement_applicant_count(sender, instance, origin=None, **kwargs):
+    # Applications removed along with their job need no count, and those
+    # removed along with their user are counted in bulk by
+    # release_applicant_counts; one UPDATE per row would be an N+1
+    if not _deleted_on_its_own(origin):
+        return
+    Job.objects.filter(pk=instance.job_id, applicant_count__gt=0).update(applicant_count=F('applicant_count') - 1)
+
+
+@receiver(post_delete, sender=Application)
+def remove_from_job_stats(sender, instance, origin=None, **kwargs):
+    if not _deleted_on_its_own(origin):
+        return
+    score = instance.match_score if instance.status == Application.STATUS_COMPLETED else None
+    remove_daily(instance.job_id, instance.applied_at, score=score)
+    if score is not None:
+        remove_score(instance.job_id, score)
+
+
+@receiver(post_delete, sender=Application)
+def remove_from_corpus_stats(sender, instance, origin=None, **kwargs):
+    # BM25 / TF-IDF statistics counted the resume when it was processed
+    if not _deleted_on_its_own(origin) or instance.status != Application.STATUS_COMPLETED or not instance.document_id:
+        return
+    weighted = (
+        Job.objects
+        .filter(pk=instance.job_id)
+        .exclude(scoring_mode=Job.SCORING_COVERAGE)
+        .annotate(text=Subquery(ResumeDocument.objects.filter(pk=instance.document_id).values('extracted_text')))
+        .values_list('keywords', 'text')
+        .first()
+    )
+    if weighted is not None:
+        keywords, text = weighted
+        remove_from_corpus(instance.job_id, keywords, [text or ""])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def release_applicant_counts(sender, instance, **kwargs):
+    """Take a deleted user's applications off their jobs' counts in one UPDATE, and out of their statistics."""
+    removed = (
+        Application.objects
+        .filter(user=instance, job=OuterRef('pk'))
+        .order_by()
+        .values('job')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Job.objects.filter(application__user=instance).update(
+        applicant_count=Greatest(F('applicant_count') - Subquery(removed), 0)
+    )
+
+    # Their processed resumes leave the corpora of weighted jobs
+    weighted = (
+        Application.objects
+        .filter(user=instance, status=Application.STATUS_COMPLETED, document__isnull=False)
+        .exclude(job__scoring_mode=Job.SCORING_COVERAGE)
+        .values_list('job_id', 'job__keywords', 'document__extracted_text')
+    )
+    texts = defaultdict(list)
+    for job_id, keywords, text in weighted:
+        texts[job_id, tuple(keywords)].append(text)
+    for (job_id, keywords), job_texts in texts.items():
+        remove_from_corpus(job_id, keywords, job_texts)
+
+    # Rebuilt once the user's applications are gone
+    job_ids = list(Application.objects.filter(user=instance).values_list('job_id', flat=True))
+    if job_ids:
+        transaction.on_commit(lambda: rebuild_job_stats(job_ids))
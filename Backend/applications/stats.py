@@ -0,0 +1,196 @@
+"""
+Match score rollups for the recruiter dashboard.
+
+`JobStats` holds one row per job and `JobDailyStats` one row per job and
+day of `applied_at` (in TIME_ZONE). Both are kept current as applications
+come and go, so the dashboard never aggregates over applications:
+
+- a new application is counted on its day, and once completed, new or
+  just processed, its score is added to both rows with one upsert each;
+- a deleted one is taken off the same way, with the job's maximum
+  recomputed from application_job_score_idx only when it was the top;
+- a rescore and the removal of a user's applications rebuild the rows of
+  the affected jobs from the applications table, as does
+  `manage.py rebuild_job_stats`; `manage.py rollup_daily_stats` rebuilds
+  the daily rows of recent days across all jobs.
+"""
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from jobs.models import Job
+from .models import Application, JobDailyStats, JobStats
+
+STATS_TABLE = JobStats._meta.db_table
+DAILY_TABLE = JobDailyStats._meta.db_table
+APPLICATIONS_TABLE = Application._meta.db_table
+
+# Element-wise sum of the stored histogram and another one
+ADD_HISTOGRAM = (
+    "ARRAY(SELECT a + b FROM unnest(s.histogram, {other}) WITH ORDINALITY AS h(a, b, i) ORDER BY i)"
+)
+
+# Day and histogram band of an application `a`, for the rebuilds
+DAY = "(a.applied_at AT TIME ZONE %(tz)s)::date"
+BUCKET = f"LEAST(GREATEST(floor(a.match_score / 10)::int, 0), {JobStats.SCORE_BUCKETS - 1})"
+BANDS = ", ".join(
+    f"count(*) FILTER (WHERE a.status = %(completed)s AND {BUCKET} = {band})"
+    for band in range(JobStats.SCORE_BUCKETS)
+)
+SCORED = "count(*) FILTER (WHERE a.status = %(completed)s)"
+SCORE_SUM = "coalesce(sum(a.match_score) FILTER (WHERE a.status = %(completed)s), 0)"
+
+# Rebuilt daily rows replace whatever an apply upserted since the DELETE
+DAILY_REPLACE = (
+    "ON CONFLICT (job_id, day) DO UPDATE SET "
+    "applications = EXCLUDED.applications, scored = EXCLUDED.scored, "
+    "score_sum = EXCLUDED.score_sum, histogram = EXCLUDED.histogram"
+)
+
+
+def score_bucket(score):
+    return min(max(int(score // 10), 0), JobStats.SCORE_BUCKETS - 1)
+
+
+def _histogram(score, count):
+    histogram = [0] * JobStats.SCORE_BUCKETS
+    if score is not None:
+        histogram[score_bucket(score)] = count
+    return histogram
+
+
+def add_score(job_id, score):
+    """Count a newly completed application of the job."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {STATS_TABLE} AS s (job_id, scored, score_sum, max_score, histogram, updated_at) "
+            "VALUES (%s, 1, %s, %s, %s, now()) "
+            "ON CONFLICT (job_id) DO UPDATE SET "
+            "scored = s.scored + 1, "
+            "score_sum = s.score_sum + EXCLUDED.score_sum, "
+            "max_score = GREATEST(s.max_score, EXCLUDED.max_score), "
+            f"histogram = {ADD_HISTOGRAM.format(other='EXCLUDED.histogram')}, "
+            "updated_at = now()",
+            [job_id, score, score, _histogram(score, 1)],
+        )
+
+
+def remove_score(job_id, score):
+    """Take a deleted completed application off the job's rollup."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {STATS_TABLE} AS s SET "
+            "scored = s.scored - 1, "
+            "score_sum = s.score_sum - %s, "
+            f"histogram = {ADD_HISTOGRAM.format(other='%s::integer[]')}, "
+            "updated_at = now() "
+            "WHERE job_id = %s AND scored > 0 "
+            "RETURNING max_score",
+            [score, _histogram(score, -1), job_id],
+        )
+        row = cursor.fetchone()
+
+        # The maximum cannot be taken apart; look it up again when the top score left
+        if row is not None and row[0] is not None and score >= row[0]:
+            cursor.execute(
+                f"UPDATE {STATS_TABLE} SET max_score = ("
+                f"SELECT max(match_score) FROM {APPLICATIONS_TABLE} WHERE job_id = %s AND status = %s"
+                ") WHERE job_id = %s",
+                [job_id, Application.STATUS_COMPLETED, job_id],
+            )
+
+
+def add_daily(job_id, applied_at, applications=1, score=None):
+    """
+    Count `applications` more applications of the job on the day of
+    `applied_at`, and `score` when given: 1 and the score for a completed
+    application, 0 and the score once a queued one is processed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {DAILY_TABLE} AS s (job_id, day, applications, scored, score_sum, histogram) "
+            "VALUES (%s, %s, %s, %s, %s, %s) "
+            "ON CONFLICT (job_id, day) DO UPDATE SET "
+            "applications = s.applications + EXCLUDED.applications, "
+            "scored = s.scored + EXCLUDED.scored, "
+            "score_sum = s.score_sum + EXCLUDED.score_sum, "
+            f"histogram = {ADD_HISTOGRAM.format(other='EXCLUDED.histogram')}",
+            [
+                job_id, timezone.localdate(applied_at), applications,
+                int(score is not None), score or 0, _histogram(score, 1),
+            ],
+        )
+
+
+def remove_daily(job_id, applied_at, score=None):
+    """Take a deleted application off its day, with its score when it was completed."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {DAILY_TABLE} AS s SET "
+            "applications = s.applications - 1, "
+            "scored = s.scored - %s, "
+            "score_sum = s.score_sum - %s, "
+            f"histogram = {ADD_HISTOGRAM.format(other='%s::integer[]')} "
+            "WHERE job_id = %s AND day = %s AND applications > 0",
+            [int(score is not None), score or 0, _histogram(score, -1), job_id, timezone.localdate(applied_at)],
+        )
+
+
+def _params(**extra):
+    return {"completed": Application.STATUS_COMPLETED, "tz": settings.TIME_ZONE, **extra}
+
+
+def rebuild_job_stats(job_ids):
+    """
+    Recompute the rollups of `job_ids`, daily rows included, from their
+    applications; returns the number of jobs rebuilt.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {STATS_TABLE} (job_id, scored, score_sum, max_score, histogram, updated_at) "
+            f"SELECT j.id, {SCORED}, {SCORE_SUM}, "
+            "max(a.match_score) FILTER (WHERE a.status = %(completed)s), "
+            f"ARRAY[{BANDS}], now() "
+            f"FROM {Job._meta.db_table} j LEFT JOIN {APPLICATIONS_TABLE} a ON a.job_id = j.id "
+            "WHERE j.id = ANY(%(jobs)s) "
+            "GROUP BY j.id "
+            "ON CONFLICT (job_id) DO UPDATE SET "
+            "scored = EXCLUDED.scored, score_sum = EXCLUDED.score_sum, max_score = EXCLUDED.max_score, "
+            "histogram = EXCLUDED.histogram, updated_at = EXCLUDED.updated_at",
+            _params(jobs=job_ids),
+        )
+        rebuilt = cursor.rowcount
+
+        cursor.execute(f"DELETE FROM {DAILY_TABLE} WHERE job_id = ANY(%(jobs)s)", {"jobs": job_ids})
+        cursor.execute(
+            f"INSERT INTO {DAILY_TABLE} (job_id, day, applications, scored, score_sum, histogram) "
+            f"SELECT a.job_id, {DAY}, count(*), {SCORED}, {SCORE_SUM}, ARRAY[{BANDS}] "
+            f"FROM {APPLICATIONS_TABLE} a WHERE a.job_id = ANY(%(jobs)s) "
+            f"GROUP BY 1, 2 {DAILY_REPLACE}",
+            _params(jobs=job_ids),
+        )
+    return rebuilt
+
+
+def rebuild_daily_stats(since=None):
+    """
+    Recompute every job's daily rows from the date `since` on, or all of
+    them; returns the number of rows written.
+    """
+    start = timezone.make_aware(datetime.combine(since, time.min)) if since else None
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {DAILY_TABLE} WHERE %(since)s::date IS NULL OR day >= %(since)s", {"since": since})
+        cursor.execute(
+            f"INSERT INTO {DAILY_TABLE} (job_id, day, applications, scored, score_sum, histogram) "
+            f"SELECT a.job_id, {DAY}, count(*), {SCORED}, {SCORE_SUM}, ARRAY[{BANDS}] "
+            f"FROM {APPLICATIONS_TABLE} a WHERE %(start)s::timestamptz IS NULL OR a.applied_at >= %(start)s "
+            f"GROUP BY 1, 2 {DAILY_REPLACE}",
+            _params(start=start),
+        )
+        return cursor.rowcount
@@ -0,0 +1,106 @@
+"""
+Resume file storage.
+
+`get_storage()` returns the backend selected by `RESUME_STORAGE_BACKEND`,
+created on first use so that importing the app never touches the network:
+
+- "supabase" uploads to a Supabase Storage bucket through its REST API on
+  the pooled keep-alive clients of `core.http`.
+- "local" writes files under `RESUME_STORAGE_LOCAL_ROOT`, for tests and
+  offline development.
+
+Backends take file objects and copy them in chunks, so an upload spooled to
+disk is never loaded into memory whole. Public URLs follow a fixed pattern
+for both backends, so they are computed locally instead of being asked for
+after every upload.
+"""
+import logging
+import shutil
+import threading
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.http import get_async_client, get_client
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseStorage:
+
+    def __init__(self, url, key, bucket):
+        if not url or not key or not bucket:
+            raise ImproperlyConfigured("SUPABASE_URL, SUPABASE_KEY and SUPABASE_BUCKET must be set in environment")
+        self.object_url = f"{url.rstrip('/')}/storage/v1/object"
+        self.bucket = bucket
+        self.headers = {
+            "Authorization": f"Bearer {key}",
+            "apikey": key,
+            "x-upsert": "true",
+        }
+
+    def _request(self, path, file):
+        # httpx streams file objects in chunks rather than reading them whole
+        url = f"{self.object_url}/{self.bucket}/{path}"
+        files = {"file": (path.rsplit("/", 1)[-1], file, "application/pdf")}
+        return url, files
+
+    def upload(self, path, file):
+        url, files = self._request(path, file)
+        get_client().post(url, headers=self.headers, files=files).raise_for_status()
+
+    async def aupload(self, path, file):
+        url, files = self._request(path, file)
+        response = await get_async_client().post(url, headers=self.headers, files=files)
+        response.raise_for_status()
+
+    def public_url(self, path):
+        return f"{self.object_url}/public/{self.bucket}/{path}"
+
+
+class LocalStorage:
+
+    def __init__(self, root, base_url):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def upload(self, path, file):
+        target = self.root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so a concurrent reader never sees half a file
+        partial = target.with_name(f"{target.name}.{threading.get_ident()}.part")
+        with partial.open("wb") as destination:
+            shutil.copyfileobj(file, destination)
+        partial.replace(target)
+
+    async def aupload(self, path, file):
+        # Disk writes block, so they run off the event loop
+        await sync_to_async(self.upload, thread_sensitive=False)(path, file)
+
+    def public_url(self, path):
+        return f"{self.base_url}/{path}"
+
+
+def _create_storage():
+    backend = settings.RESUME_STORAGE_BACKEND
+    if backend == "supabase":
+        return SupabaseStorage(settings.SUPABASE_URL, settings.SUPABASE_KEY, settings.SUPABASE_BUCKET)
+    if backend == "local":
+        return LocalStorage(settings.RESUME_STORAGE_LOCAL_ROOT, settings.RESUME_STORAGE_LOCAL_URL)
+    raise ImproperlyConfigured(f"Unknown RESUME_STORAGE_BACKEND: {backend}")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    global _storage
+
+    with _storage_lock:
+        if _storage is None:
+            _storage = _create_storage()
+            logger.info(f"Resume storage: {type(_storage).__name__}")
+    return _storage
@@ -1,3 +1,551 @@
-from django.test import TestCase
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.synthetic import make_pdf
+from core.tests import KEYWORDS, RESUME_TEXT, QueryBudgetTestCase, User
+from jobs.models import Job
+from .extraction import ExtractionEngine, _raise_budget_exceeded, read_pdf_pages
+from .ingestion import claim_next, enqueue_application, process_ingestion, run_worker
+from .models import Application, JobCorpusStats, JobRescore, ResumeDocument, ResumeIngestion
+from .rescoring import rescore_job_applications
+from .matching import KeywordMatcher, compile_keywords
+from .scoring import bm25_scores, score_application, score_pool, term_frequencies, tfidf_scores
+from .services import clean_text, compute_match_score, extract_resume_text
+
+
+RESUME_PDF = make_pdf("Python Django developer with Docker experience")
+
+
+def repeat_pages(pdf, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_page(PdfReader(io.BytesIO(pdf)).pages[0])
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class ApplicationQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_apply(self):
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        self.assertWithinBudget(
+            'post', f'/applications/{self.job.job_id}/apply/', self.new_applicant,
+            data={'resume': resume}, status=201,
+        )
+
+    def test_apply_with_known_resume(self):
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        self.call('post', f'/applications/{self.job.job_id}/apply/', self.new_applicant, data={'resume': resume})
+
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        self.assertWithinBudget(
+            'post', f'/applications/{self.jobs[1].job_id}/apply/', self.new_applicant,
+            data={'resume': resume}, status=201,
+        )
+
+    def test_my_applications(self):
+        _, small = self.assertWithinBudget('get', '/applications/my-applications/', self.light_applicant)
+        _, large = self.assertWithinBudget('get', '/applications/my-applications/', self.applicant)
+        self.assertConstantQueries(small, large)
+
+    def test_application_status(self):
+        self.assertWithinBudget('get', f'/applications/{self.application.id}/status/', self.applicant)
+
+    def test_job_applicants(self):
+        path = f'/applications/{self.job.job_id}/applicants/'
+        response, small = self.assertWithinBudget('get', f'{path}?top=1', self.recruiter)
+        _, large = self.assertWithinBudget('get', f'{path}?page_size=200', self.recruiter)
+        self.assertConstantQueries(small, large)
+
+    def test_job_applicants_next_page(self):
+        path = f'/applications/{self.job.job_id}/applicants/'
+        response, _ = self.assertWithinBudget('get', f'{path}?page_size=5&min_score=10', self.recruiter)
+        self.assertWithinBudget('get', f"{path}?page_size=5&cursor={response.data['next_cursor']}", self.recruiter)
+
+    def test_job_applicants_of_another_recruiter(self):
+        response, _ = self.call('get', f'/applications/{self.job.job_id}/applicants/', self.other_recruiter)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {"error": "Job not found"})
+
+    def test_candidate_search(self):
+        _, small = self.assertWithinBudget('get', '/applications/search/?q=python&page_size=1', self.recruiter)
+        _, large = self.assertWithinBudget('get', '/applications/search/?q=python&page_size=100', self.recruiter)
+        self.assertConstantQueries(small, large)
+        self.assertWithinBudget('get', '/applications/search/?skills=django,docker', self.recruiter)
+
+    def test_listings_leave_resume_text_behind(self):
+        for path, user in [
+            ('/applications/my-applications/', self.applicant),
+            (f'/applications/{self.job.job_id}/applicants/', self.recruiter),
+            ('/dashboard/applicant/applications/', self.applicant),
+        ]:
+            response, queries = self.call('get', path, user)
+            self.assertEqual(response.status_code, 200)
+            for query in queries.captured_queries:
+                self.assertNotIn('extracted_text', query['sql'], path)
+                self.assertNotIn('search_vector', query['sql'], path)
+
+    def test_seeded_applications_are_completed(self):
+        self.assertFalse(Application.objects.exclude(status=Application.STATUS_COMPLETED).exists())
+
+
+@override_settings(MAX_UPLOAD_SIZE=100 * 1024)
+class UploadLimitTests(QueryBudgetTestCase):
+
+    def apply(self, size):
+        self.documents = ResumeDocument.objects.count()
+        resume = SimpleUploadedFile('resume.pdf', b'%PDF-1.4\n' + b'0' * size, content_type='application/pdf')
+        response, _ = self.call('post', f'/applications/{self.job.job_id}/apply/', self.new_applicant, data={'resume': resume})
+        return response
+
+    def assertNothingStored(self, response):
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Application.objects.filter(user=self.new_applicant).exists())
+        self.assertEqual(ResumeDocument.objects.count(), self.documents)
+
+    def test_declared_length_over_limit(self):
+        # Refused from Content-Length alone, before the body is read
+        self.assertNothingStored(self.apply(200 * 1024))
+
+    def test_streamed_upload_over_limit(self):
+        # Within the multipart allowance, so only counting the chunks catches it
+        self.assertNothingStored(self.apply(120 * 1024))
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=256)
+    def test_large_upload_read_from_disk(self):
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        with mock.patch('applications.ingestion.extract_resume_text', wraps=extract_resume_text) as extract:
+            response, _ = self.call(
+                'post', f'/applications/{self.job.job_id}/apply/', self.new_applicant, data={'resume': resume},
+            )
+
+        self.assertEqual(response.status_code, 201)
+        # Handed over as the spooled file's path, not as bytes
+        [source], _ = extract.call_args
+        self.assertIsInstance(source, str)
+        self.assertEqual(response.data['match_score'], 100.0)
+
+
+class MyApplicationsConditionalGetTests(QueryBudgetTestCase):
+
+    def test_not_modified(self):
+        etag = self.call('get', '/applications/my-applications/', self.applicant)[0]['ETag']
+
+        response, queries = self.call('get', '/applications/my-applications/', self.applicant, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 2)  # user and the aggregate
+
+    def test_modified_by_status_change(self):
+        etag = self.call('get', '/applications/my-applications/', self.applicant)[0]['ETag']
+        self.application.status = Application.STATUS_FAILED
+        self.application.save()
+
+        response, _ = self.call('get', '/applications/my-applications/', self.applicant, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+# Two keywords over three cleaned resumes: python appears in two of them,
+# django in one. Expected scores below were worked out by hand from the
+# BM25 (k1 1.2, b 0.75) and TF-IDF formulas in scoring.py.
+CORPUS = ["python django python", "python java", "go rust"]
+TERMS = ["python", "django"]
+
+
+def legacy_match_score(text, keywords):
+    """compute_match_score as it was before keyword lists were compiled."""
+    if not keywords:
+        return 0
+    text_words = set(text.split())
+    match_count = 0
+    for kw in keywords:
+        kw_clean = kw.lower()
+        if " " in kw_clean:
+            if kw_clean in text:
+                match_count += 1
+        elif kw_clean in text_words:
+            match_count += 1
+    return round((match_count / len(keywords)) * 100, 2)
+
+
+RESUMES = [
+    "Senior Python, Django developer. Built REST APIs on PostgreSQL; deployed with Docker & Kubernetes.",
+    "Frontend engineer: JavaScript, TypeScript, React and Node.js. Some Java at university.",
+    "Data scientist - machine learning, deep learning, NLP. Python, pandas, scikit-learn, SQL.",
+    "Machine operator with 10 years of learning on the job. Forklift licence.",
+    "",
+]
+
+KEYWORD_LISTS = [
+    ["Python", "Django", "Docker", "Kubernetes"],
+    ["Java", "Spring Boot", "Microservices"],
+    ["JavaScript", "React", "Node"],
+    ["Machine Learning", "Deep Learning", "Python", "SQL"],
+    ["REST APIs", "PostgreSQL", "AWS"],
+    ["Go"],
+]
+
+
+class KeywordMatcherTests(SimpleTestCase):
+
+    def test_scores_match_previous_implementation(self):
+        for resume in RESUMES:
+            text = clean_text(resume)
+            for keywords in KEYWORD_LISTS:
+                with self.subTest(resume=resume, keywords=keywords):
+                    self.assertEqual(compute_match_score(text, keywords), legacy_match_score(text, keywords))
+
+    def test_hand_computed_scores(self):
+        text = clean_text(RESUMES[0])
+        self.assertEqual(compute_match_score(text, KEYWORD_LISTS[0]), 100.0)
+        self.assertEqual(compute_match_score(text, KEYWORD_LISTS[4]), 66.67)
+        self.assertEqual(compute_match_score(text, []), 0)
+
+    def test_whole_words_only(self):
+        text = clean_text(RESUMES[1])
+        # "Java" is a word of its own here; "Script" only occurs inside "JavaScript"
+        self.assertEqual(compute_match_score(text, ["Java", "Script", "Type"]), 33.33)
+        self.assertEqual(compute_match_score(clean_text("JavaScript only"), ["Java"]), 0)
+
+    def test_case_folding(self):
+        self.assertEqual(compute_match_score("python django", ["PYTHON", "dJango"]), 100.0)
+
+    def test_phrases_need_consecutive_whole_words(self):
+        self.assertEqual(compute_match_score(clean_text(RESUMES[2]), ["Machine Learning"]), 100.0)
+        # Both words occur, but not next to each other
+        self.assertEqual(compute_match_score(clean_text(RESUMES[3]), ["Machine Learning"]), 0)
+        # The one deliberate change: a phrase no longer matches inside longer words
+        text = "xmachine learningops"
+        self.assertEqual(legacy_match_score(text, ["machine learning"]), 100.0)
+        self.assertEqual(compute_match_score(text, ["machine learning"]), 0)
+
+    def test_many_lists_in_one_pass(self):
+        matcher = KeywordMatcher(dict(enumerate(KEYWORD_LISTS)))
+        for resume in RESUMES:
+            text = clean_text(resume)
+            self.assertEqual(
+                matcher.scores(text),
+                {key: legacy_match_score(text, keywords) for key, keywords in enumerate(KEYWORD_LISTS)},
+            )
+        texts = [clean_text(resume) for resume in RESUMES]
+        self.assertEqual(matcher.score_many(texts, 3), [legacy_match_score(t, KEYWORD_LISTS[3]) for t in texts])
+
+    def test_compiled_once_per_keyword_list(self):
+        self.assertIs(compile_keywords(["Python", "Go"]), compile_keywords(("Python", "Go")))
+        self.assertIsNot(compile_keywords(["Python", "Go"]), compile_keywords(["Python", "Rust"]))
+
+
+class ScoringTests(SimpleTestCase):
+
+    def test_term_frequencies(self):
+        tf, lengths = term_frequencies(CORPUS + ["rest api rest api", ""], TERMS + ["rest api"])
+        self.assertEqual(tf.tolist(), [[2, 1, 0], [1, 0, 0], [0, 0, 0], [0, 0, 2], [0, 0, 0]])
+        self.assertEqual(lengths.tolist(), [3, 2, 2, 4, 0])
+
+    def test_bm25(self):
+        tf, lengths = term_frequencies(CORPUS, TERMS)
+        scores = bm25_scores(tf, lengths, np.array([2.0, 1.0]), documents=3, average_length=7 / 3)
+        for score, expected in zip(scores, [46.2546, 15.6392, 0]):
+            self.assertAlmostEqual(score, expected, places=3)
+
+    def test_tfidf(self):
+        tf, _ = term_frequencies(CORPUS, TERMS)
+        scores = tfidf_scores(tf, np.array([2.0, 1.0]), documents=3)
+        for score, expected in zip(scores, [96.6315, 60.5349, 0]):
+            self.assertAlmostEqual(score, expected, places=3)
+
+    def test_score_pool(self):
+        job = Job(keywords=["Python", "Django"], scoring_mode=Job.SCORING_BM25)
+        scores, stats = score_pool(job, CORPUS)
+        self.assertEqual(scores, [46.25, 15.64, 0.0])
+        self.assertEqual(stats, {
+            'documents': 3,
+            'total_length': 7,
+            'doc_freq': {'python': 2, 'django': 1},
+            'scored_documents': 3,
+        })
+
+        job.scoring_mode = Job.SCORING_TFIDF
+        self.assertEqual(score_pool(job, CORPUS)[0], [96.63, 60.53, 0.0])
+
+    def test_empty_pool(self):
+        job = Job(keywords=["Python"], scoring_mode=Job.SCORING_BM25)
+        self.assertEqual(score_pool(job, []), ([], {
+            'documents': 0, 'total_length': 0, 'doc_freq': {'python': 0}, 'scored_documents': 0,
+        }))
+
+
+class CorpusStatsTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # A weighted job with statistics from a full pass over its pool
+        self.weighted = self.jobs[3]
+        self.weighted.scoring_mode = Job.SCORING_BM25
+        self.weighted.save()
+        rescore_job_applications(self.weighted)
+
+    def pool_stats(self):
+        texts = list(
+            Application.objects
+            .filter(job=self.weighted, status=Application.STATUS_COMPLETED)
+            .values_list('document__extracted_text', flat=True)
+        )
+        _, stats = score_pool(self.weighted, texts)
+        return {name: stats[name] for name in ('documents', 'total_length', 'doc_freq')}
+
+    def stored_stats(self):
+        return JobCorpusStats.objects.values('documents', 'total_length', 'doc_freq').get(job=self.weighted)
+
+    def test_drift_requests_rescore(self):
+        JobCorpusStats.objects.filter(job=self.weighted).update(documents=20, scored_documents=20)
+
+        # 10% of 20 scored resumes: the second new one asks for a rescore
+        with self.captureOnCommitCallbacks():
+            score_application(self.weighted, RESUME_TEXT)
+            self.assertFalse(JobRescore.objects.filter(job=self.weighted).exists())
+            score_application(self.weighted, RESUME_TEXT)
+        self.assertTrue(JobRescore.objects.filter(job=self.weighted, started_at__isnull=True).exists())
+
+    def test_apply_past_drift_returns_before_rescoring(self):
+        JobCorpusStats.objects.filter(job=self.weighted).update(documents=1, scored_documents=1)
+        rescored_on = []
+
+        with mock.patch('applications.rescoring.run_rescore', side_effect=lambda job_id: rescored_on.append(threading.current_thread())):
+            with self.captureOnCommitCallbacks(execute=True):
+                resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+                response, _ = self.call(
+                    'post', f'/applications/{self.weighted.job_id}/apply/', self.new_applicant, data={'resume': resume},
+                )
+                self.assertEqual(rescored_on, [])
+            for thread in threading.enumerate():
+                if thread.name == f"rescore-job-{self.weighted.pk}":
+                    thread.join(5)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(rescored_on), 1)
+        self.assertIsNot(rescored_on[0], threading.current_thread())
+
+    def test_deleted_application_leaves_corpus(self):
+        Application.objects.filter(job=self.weighted).first().delete()
+        self.assertEqual(self.stored_stats(), self.pool_stats())
+
+    def test_deleted_user_leaves_corpus(self):
+        user = Application.objects.filter(job=self.weighted).first().user
+        self.call('delete', '/auth/me/delete/', user)
+        self.assertEqual(self.stored_stats(), self.pool_stats())
+
+
+class ExtractionBudgetTests(SimpleTestCase):
+
+    def setUp(self):
+        # Extraction workers install the handler at start-up
+        previous = signal.signal(signal.SIGALRM, _raise_budget_exceeded)
+        self.addCleanup(signal.signal, signal.SIGALRM, previous)
+
+    def test_whole_document(self):
+        text, pages, reason = read_pdf_pages(repeat_pages(RESUME_PDF, 3))
+        self.assertEqual((pages, reason), (3, None))
+        self.assertEqual(text.count("Python Django"), 3)
+
+    def test_page_budget(self):
+        text, pages, reason = read_pdf_pages(repeat_pages(RESUME_PDF, 3), max_pages=2)
+        self.assertEqual((pages, reason), (2, "page_limit"))
+        self.assertEqual(text.count("Python Django"), 2)
+
+    def test_time_budget_is_not_swallowed_by_the_parser(self):
+        def slow_page(page, *args, **kwargs):
+            try:
+                time.sleep(5)
+            except Exception:
+                # PyPDF2 guards much of its parsing like this
+                pass
+            return "unreachable"
+
+        started = time.monotonic()
+        with mock.patch.object(PageObject, "extract_text", slow_page):
+            text, pages, reason = read_pdf_pages(repeat_pages(RESUME_PDF, 2), timeout=0.2)
+
+        self.assertEqual((text, pages, reason), ("", 0, "timeout"))
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_memory_budget_keeps_pages_read(self):
+        with mock.patch.object(PageObject, "extract_text", side_effect=["first page", MemoryError]):
+            text, pages, reason = read_pdf_pages(repeat_pages(RESUME_PDF, 3))
+        self.assertEqual((text, pages, reason), ("first page", 1, "memory_limit"))
+
+
+class ExtractionEngineTests(SimpleTestCase):
+
+    def test_unresponsive_worker_is_killed(self):
+        engine = ExtractionEngine(max_workers=1)
+        self.addCleanup(engine.shutdown)
+        executor = engine._get_executor()
+        pid = executor.submit(os.getpid).result(timeout=30)
+        executor.submit(time.sleep, 60)
+        self.assertIn(pid, [p.pid for p in multiprocessing.active_children()])
+
+        engine._discard_executor(executor)
+
+        deadline = time.monotonic() + 5
+        while any(p.pid == pid for p in multiprocessing.active_children()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertNotIn(pid, [p.pid for p in multiprocessing.active_children()])
+        self.assertIsNot(engine._get_executor(), executor)
+
+
+def resume_upload():
+    return SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+
+
+class IngestionQueueTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.queued = enqueue_application(self.new_applicant, self.job, resume_upload())
+
+    def claim(self):
+        task = claim_next()
+        self.assertIsNotNone(task)
+        self.assertEqual(task.application_id, self.queued.id)
+        return task
+
+    def make_due(self, task):
+        ResumeIngestion.objects.filter(pk=task.pk).update(available_at=timezone.now())
+
+    def test_claimed_task_is_leased(self):
+        task = self.claim()
+        self.assertEqual(task.attempts, 1)
+        self.assertIsNotNone(task.locked_at)
+        self.assertIsNone(claim_next())
+
+    def test_expired_lease_is_claimed_again(self):
+        task = self.claim()
+        lease = timedelta(seconds=settings.RESUME_INGESTION_LEASE_SECONDS)
+        ResumeIngestion.objects.filter(pk=task.pk).update(locked_at=timezone.now() - lease - timedelta(seconds=1))
+
+        self.assertEqual(self.claim().attempts, 2)
+
+    def test_processed_task_completes_application(self):
+        self.assertTrue(process_ingestion(self.claim()))
+
+        self.queued.refresh_from_db()
+        self.assertEqual(self.queued.status, Application.STATUS_COMPLETED)
+        # The resume names both of the job's keywords, Python and Django
+        self.assertEqual(self.queued.match_score, 100.0)
+        self.assertFalse(ResumeIngestion.objects.filter(application=self.queued).exists())
+
+    @override_settings(RESUME_INGESTION_RETRY_DELAY=30)
+    def test_failed_attempts_back_off(self):
+        with mock.patch('applications.ingestion.create_document', side_effect=RuntimeError('storage down')):
+            for attempt, delay in [(1, 30), (2, 60), (3, 120)]:
+                task = self.claim()
+                before = timezone.now()
+                self.assertFalse(process_ingestion(task))
+
+                task.refresh_from_db()
+                self.assertEqual(task.attempts, attempt)
+                self.assertIsNone(task.locked_at)
+                self.assertEqual(task.last_error, 'RuntimeError: storage down')
+                self.assertAlmostEqual((task.available_at - before).total_seconds(), delay, delta=1)
+                self.assertIsNone(claim_next())
+                self.make_due(task)
+
+        self.queued.refresh_from_db()
+        self.assertEqual(self.queued.status, Application.STATUS_PENDING)
+
+    @override_settings(RESUME_INGESTION_MAX_ATTEMPTS=2)
+    def test_last_attempt_fails_application(self):
+        with mock.patch('applications.ingestion.create_document', side_effect=RuntimeError('storage down')):
+            for _ in range(2):
+                task = self.claim()
+                self.assertFalse(process_ingestion(task))
+                self.make_due(task)
+
+        self.queued.refresh_from_db()
+        self.assertEqual(self.queued.status, Application.STATUS_FAILED)
+        self.assertIsNone(claim_next())
+
+        response, _ = self.call('get', f'/applications/{self.queued.id}/status/', self.new_applicant)
+        self.assertEqual(response.data['status'], Application.STATUS_FAILED)
+        self.assertEqual(response.data['error'], 'Resume processing failed')
+
+    def test_scoring_failure_is_retried(self):
+        with mock.patch('applications.ingestion.score_application', side_effect=RuntimeError('scoring down')):
+            self.assertFalse(process_ingestion(self.claim()))
+
+        task = ResumeIngestion.objects.get(application=self.queued)
+        self.assertEqual(task.attempts, 1)
+        self.assertIsNone(task.locked_at)
+        self.assertEqual(task.last_error, 'RuntimeError: scoring down')
+        self.assertGreater(task.available_at, timezone.now())
+
+        # The half-done completion was rolled back
+        self.queued.refresh_from_db()
+        self.assertEqual(self.queued.status, Application.STATUS_PENDING)
+        self.assertIsNone(self.queued.document_id)
+
+    def test_worker_survives_failing_tasks(self):
+        JobRescore.objects.create(job=self.jobs[1])
+
+        with mock.patch('applications.ingestion.score_application', side_effect=RuntimeError('scoring down')), \
+                mock.patch('applications.ingestion.process_rescore', side_effect=RuntimeError('rescore down')), \
+                mock.patch('applications.ingestion.close_old_connections'), \
+                mock.patch('applications.ingestion.connection'):
+            processed = run_worker(threading.Event(), once=True)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(ResumeIngestion.objects.get(application=self.queued).last_error, 'RuntimeError: scoring down')
+
+
+class IngestionClaimLockTests(TransactionTestCase):
+
+    def test_locked_task_is_skipped_not_waited_on(self):
+        recruiter = User.objects.create_user('recruiter', 'recruiter@example.com', 'pass', role='recruiter')
+        applicant = User.objects.create_user('applicant', 'applicant@example.com', 'pass', role='applicant')
+        job = Job.objects.create(
+            created_by=recruiter, title="Backend Engineer", description="d", company_name="Acme",
+            location="Remote", experience_required="1", keywords=KEYWORDS,
+        )
+        application = enqueue_application(applicant, job, resume_upload())
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            # Another worker, part way through claiming the same task
+            try:
+                with transaction.atomic():
+                    ResumeIngestion.objects.select_for_update().get(application=application)
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            started = time.monotonic()
+            self.assertIsNone(claim_next())
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual(claim_next().application_id, application.id)
@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from .views import ApplyJobView, JobApplicantsView, MyApplicationsView 
+from .views import ApplyJobView, AsyncApplyJobView, JobApplicantsView, MyApplicationsView, ApplicationStatusView, CandidateSearchView
+
+# Under ASGI the resume upload is awaited on the event loop instead of holding a worker thread
+apply_view = AsyncApplyJobView if settings.ASYNC_VIEWS else ApplyJobView
 
 urlpatterns = [
     path('my-applications/', MyApplicationsView.as_view(), name='my-applications'),
-    path('<uuid:job_id>/apply/', ApplyJobView.as_view(), name='apply-job'),
+    path('search/', CandidateSearchView.as_view(), name='candidate-search'),
+    path('<uuid:job_id>/apply/', apply_view.as_view(), name='apply-job'),
+    path('<int:application_id>/status/', ApplicationStatusView.as_view(), name='application-status'),
     path('<uuid:job_id>/applicants/', JobApplicantsView.as_view(), name='job-applicants'),
 
 ]
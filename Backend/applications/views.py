@@ -1,21 +1,27 @@
 import logging
+import uuid
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Max
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from accounts.permissions import IsApplicant, IsRecruiter
 from .models import Application
-from .serializers import  RecruiterApplicationSerializer
-from .services import extract_resume_text, compute_match_score
-from jobs.models import Job
-from django.conf import settings
-
-from .supabase_client import supabase
+from .serializers import  RecruiterApplicationSerializer, CandidateSearchResultSerializer
+from .ingestion import (
+    ALREADY_APPLIED, acreate_document, apply_with_document, check_application, create_document, hash_resume,
+    queued_data, start_application, submitted_data,
+)
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from jobs.models import Job, SEARCH_CONFIG
+from core.async_views import AsyncAPIView, database_slot
+from core.conditional import conditional_get
+from core.pagination import ApplicantPagination, CandidateSearchPagination
 
 logger = logging.getLogger(__name__)
-from django.conf import settings
-print("SUPABASE KEY STARTS WITH:", settings.SUPABASE_KEY[:10])
 
 
 class ApplyJobView(APIView):
@@ -23,91 +29,140 @@ class ApplyJobView(APIView):
 
     def post(self, request, job_id):
 
-        # 1. Validate job
-        try:
-            job = Job.objects.get(job_id=job_id, is_active=True)
-        except Job.DoesNotExist:
-            return Response({"error": "Job not found or inactive"}, status=404)
-
-        # 2. Validate resume
         resume = request.FILES.get("resume")
-        if not resume:
-            return Response({"error": "Resume file is required"}, status=400)
-
-        # 3. Prevent duplicate applications
-        if Application.objects.filter(user=request.user, job=job).exists():
-            return Response({"error": "Already applied to this job"}, status=400)
+        job, error, code = check_application(request.user, job_id, resume)
+        if error:
+            return Response({"error": error}, status=code)
 
+        # Identical files are parsed and uploaded only once
+        sha256 = hash_resume(resume)
         try:
-            # Extract text
-            resume.seek(0)
-            resume_bytes = resume.read()
-            extracted_text = extract_resume_text(resume_bytes)
-
-            score = compute_match_score(extracted_text, job.keywords)
+            document, queued = start_application(request.user, job, sha256, resume)
+        except IntegrityError:
+            return Response({"error": ALREADY_APPLIED}, status=400)
 
-            # Supabase upload path
-            file_path = f"{request.user.id}/{job.job_id}/{resume.name}"
+        if queued is not None:
+            return Response(queued_data(queued), status=202)
 
-            try:
-                # Upload to Supabase
-                upload_response = supabase.storage.from_(settings.SUPABASE_BUCKET).upload(
-                    file_path,
-                    resume_bytes,
-                    {
-                        "content-type": "application/pdf",
-                        "x-upsert": "true"
-                    }
-                )
-                logger.info(f"Upload response: {upload_response}")
-
-                # Public URL
-                public_url = supabase.storage.from_(settings.SUPABASE_BUCKET).get_public_url(file_path)
-                logger.info(f"Generated public URL: {public_url}")
-            except Exception as upload_error:
-                logger.error(f"Supabase upload error details: {type(upload_error).__name__} - {str(upload_error)}")
-                raise
+        try:
+            if document is None:
+                # Extract text and upload to storage
+                document = create_document(sha256, resume)
 
             # Save Application
             with transaction.atomic():
-                application = Application.objects.create(
-                    user=request.user,
-                    job=job,
-                    resume_file=public_url,
-                    extracted_text=extracted_text,
-                    match_score=score
-                )
+                application = apply_with_document(request.user, job, document)
 
-            return Response({
-                "message": "Application submitted successfully",
-                "match_score": score,
-                "resume_url": public_url,
-                "application_id": application.id
-            }, status=201)
+            return Response(submitted_data(application), status=201)
 
         except Exception as e:
             logger.error(f"Supabase upload error: {str(e)}")
             return Response({"error": "Upload failed"}, status=500)
 
 
+class AsyncApplyJobView(AsyncAPIView):
+    """
+    ApplyJobView for ASGI deployments. Database work runs in threads and the
+    Supabase upload is awaited on the event loop, so a worker keeps serving
+    other requests while uploads are in flight.
+    """
+    required_role = "applicant"
+
+    async def post(self, request, job_id):
+
+        resume = request.FILES.get("resume")
+
+        async with database_slot():
+            job, error, code = await sync_to_async(check_application)(request.user, job_id, resume)
+        if error:
+            return JsonResponse({"error": error}, status=code)
+
+        # Reading the file does not need the database thread
+        sha256 = await sync_to_async(hash_resume, thread_sensitive=False)(resume)
+
+        async with database_slot():
+            try:
+                document, queued = await sync_to_async(start_application)(request.user, job, sha256, resume)
+            except IntegrityError:
+                return JsonResponse({"error": ALREADY_APPLIED}, status=400)
+
+        if queued is not None:
+            return JsonResponse(queued_data(queued), status=202)
+
+        try:
+            # No database connection is held while the upload is in flight
+            if document is None:
+                document = await acreate_document(sha256, resume)
+
+            async with database_slot():
+                application = await sync_to_async(transaction.atomic(apply_with_document))(request.user, job, document)
+
+            return JsonResponse(submitted_data(application), status=201)
+
+        except Exception as e:
+            logger.error(f"Supabase upload error: {str(e)}")
+            return JsonResponse({"error": "Upload failed"}, status=500)
+
+
+class ApplicationStatusView(APIView):
+    """Lets applicants poll an application submitted in async ingestion mode"""
+    permission_classes = [IsAuthenticated, IsApplicant]
+
+    def get(self, request, application_id):
+        try:
+            application = Application.objects.get(id=application_id, user=request.user)
+        except Application.DoesNotExist:
+            return Response({"error": "Application not found"}, status=404)
+
+        data = {
+            "application_id": application.id,
+            "status": application.status,
+        }
+        if application.status == Application.STATUS_COMPLETED:
+            data["match_score"] = application.match_score
+            data["resume_url"] = application.resume_file
+        elif application.status == Application.STATUS_FAILED:
+            data["error"] = "Resume processing failed"
+
+        return Response(data)
+
+
 class JobApplicantsView(APIView):
+    """A job's applicants, best match first, one keyset page at a time."""
     permission_classes = [IsAuthenticated, IsRecruiter]
 
     def get(self, request, job_id):
-        job = Job.objects.get(job_id=job_id, created_by=request.user)
+        try:
+            job = Job.objects.only('id', 'applicant_count').get(job_id=job_id, created_by=request.user)
+        except Job.DoesNotExist:
+            return Response({"error": "Job not found"}, status=404)
 
         applicants = (
             Application.objects
             .filter(job=job)
             .select_related('user')
-            .order_by('-match_score')
+            .only(
+                'id', 'match_score', 'status', 'resume_file', 'applied_at',
+                'user__username', 'user__full_name', 'user__skills',
+            )
         )
 
-        serializer = RecruiterApplicationSerializer(applicants, many=True)
+        min_score = request.query_params.get('min_score')
+        if min_score:
+            try:
+                applicants = applicants.filter(match_score__gte=float(min_score))
+            except ValueError:
+                return Response({"error": "min_score must be a number"}, status=400)
+
+        paginator = ApplicantPagination()
+        page = paginator.paginate_queryset(applicants, request, self)
+        serializer = RecruiterApplicationSerializer(page, many=True)
 
         return Response({
             'job_id': job_id,
-            'total_applicants': applicants.count(),
+            'total_applicants': job.applicant_count,
+            'next': paginator.get_next_link(),
+            'next_cursor': paginator.get_next_cursor(),
             'applicants': serializer.data
         })
 
@@ -116,11 +171,29 @@ class MyApplicationsView(APIView):
     """View for applicants to see their own job applications"""
     permission_classes = [IsAuthenticated, IsApplicant]
 
+    def get_validators(self, request):
+        # Status and score changes touch the application, edits touch its job
+        latest = Application.objects.filter(user=request.user).aggregate(
+            count=Count("id"),
+            applied=Max("updated_at"),
+            job=Max("job__updated_at"),
+        )
+        # ETag only: a withdrawn application leaves the maxima behind
+        return (latest["count"], latest["applied"], latest["job"]), None
+
+    @conditional_get
     def get(self, request):
         """Get all applications submitted by the authenticated applicant"""
-        applications = Application.objects.filter(user=request.user).order_by("-applied_at")
+        applications = list(
+            Application.objects
+            .filter(user=request.user)
+            .select_related("job")
+            # Listed fields only; the job's search vector and keywords stay on disk
+            .defer("job__requirements", "job__keywords", "job__search_vector")
+            .order_by("-applied_at")
+        )
         
-        if not applications.exists():
+        if not applications:
             return Response({
                 "message": "No applications found",
                 "applications": []
@@ -131,7 +204,51 @@ class MyApplicationsView(APIView):
         
         return Response({
             "message": "Applications retrieved successfully",
-            "total_applications": applications.count(),
+            "total_applications": len(applications),
             "applications": serializer.data
         }, status=status.HTTP_200_OK)
 
+
+class CandidateSearchView(APIView):
+    """Full-text search over the resumes of everyone who applied to the recruiter's jobs"""
+    permission_classes = [IsAuthenticated, IsRecruiter]
+
+    def get(self, request):
+        search = request.query_params.get("q", "").strip()
+        skills = [
+            skill.strip()
+            for skill in request.query_params.get("skills", "").split(",")
+            if skill.strip()
+        ]
+        if not search and not skills:
+            return Response({"error": "Provide a search query (q) or skills"}, status=400)
+
+        # Free text uses web-search syntax; every listed skill must appear as a phrase
+        query = None
+        if search:
+            query = SearchQuery(search, search_type="websearch", config=SEARCH_CONFIG)
+        for skill in skills:
+            skill_query = SearchQuery(skill, search_type="phrase", config=SEARCH_CONFIG)
+            query = skill_query if query is None else query & skill_query
+
+        candidates = (
+            Application.objects
+            .filter(job__created_by=request.user, status=Application.STATUS_COMPLETED)
+            .filter(document__search_vector=query)
+            .annotate(rank=SearchRank(F("document__search_vector"), query))
+            .select_related("user", "job")
+            .defer("job__description", "job__requirements", "job__search_vector")
+            .order_by("-rank", "-match_score", "-id")
+        )
+
+        job_id = request.query_params.get("job")
+        if job_id:
+            try:
+                candidates = candidates.filter(job__job_id=uuid.UUID(job_id))
+            except ValueError:
+                return Response({"error": "Invalid job id"}, status=400)
+
+        paginator = CandidateSearchPagination()
+        page = paginator.paginate_queryset(candidates, request, view=self)
+        serializer = CandidateSearchResultSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
@@ -97,6 +97,10 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
+# Serve the network-bound endpoints (resume upload, AI keywords) with async
+# views. Enable when running under an ASGI server (see README).
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
@@ -123,7 +127,9 @@ DATABASES = {
     'default': dj_database_url.config(
         
         default=os.getenv('DATABASE_URL'),
-        conn_max_age=600
+        # Under ASGI every request runs its database work in a thread of its
+        # own, so persistent connections would pile up; close them per request
+        conn_max_age=0 if ASYNC_VIEWS else 600
     )
 }
 
@@ -192,8 +198,87 @@ cloudinary.config(
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET")
+
+# "supabase" uploads resumes to SUPABASE_BUCKET; "local" writes them to disk
+# (tests and offline development).
+RESUME_STORAGE_BACKEND = os.getenv("RESUME_STORAGE_BACKEND", "supabase")
+RESUME_STORAGE_LOCAL_ROOT = os.getenv("RESUME_STORAGE_LOCAL_ROOT", str(BASE_DIR / "media" / "resumes"))
+RESUME_STORAGE_LOCAL_URL = os.getenv("RESUME_STORAGE_LOCAL_URL", "/media/resumes/")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Pooled httpx clients for outbound requests (resume storage)
+HTTP_CLIENT_TIMEOUT = int(os.getenv("HTTP_CLIENT_TIMEOUT", 30))  # seconds
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", 20))
+
+# Database connections an ASGI worker's async views may hold at once
+ASYNC_DB_CONNECTIONS = int(os.getenv("ASYNC_DB_CONNECTIONS", 20))
+
+# "gemini" calls the model; "stub" answers locally (development and tests).
+AI_KEYWORD_BACKEND = os.getenv("AI_KEYWORD_BACKEND", "gemini")
+AI_KEYWORD_CACHE_SIZE = int(os.getenv("AI_KEYWORD_CACHE_SIZE", 1024))
+AI_KEYWORD_CACHE_TTL = int(os.getenv("AI_KEYWORD_CACHE_TTL", 3600))  # seconds
+AI_KEYWORD_BATCH_MAX = int(os.getenv("AI_KEYWORD_BATCH_MAX", 50))
+AI_KEYWORD_CONCURRENCY = int(os.getenv("AI_KEYWORD_CONCURRENCY", 50))  # upstream calls in flight per process
+
+# Uploaded files over MAX_UPLOAD_SIZE are refused with 413. Files up to
+# FILE_UPLOAD_MAX_MEMORY_SIZE are kept in memory, larger ones are spooled to
+# a temporary file as they arrive.
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # bytes
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", 512 * 1024))  # bytes
+FILE_UPLOAD_HANDLERS = [
+    "core.uploads.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# "sync" processes resumes inside the request, "async" queues them for
+# `manage.py process_resumes` and answers 202 straight away.
+RESUME_INGESTION_MODE = os.getenv("RESUME_INGESTION_MODE", "sync")
+RESUME_INGESTION_MAX_ATTEMPTS = int(os.getenv("RESUME_INGESTION_MAX_ATTEMPTS", 5))
+RESUME_INGESTION_RETRY_DELAY = int(os.getenv("RESUME_INGESTION_RETRY_DELAY", 30))  # seconds, doubled per attempt
+RESUME_INGESTION_LEASE_SECONDS = int(os.getenv("RESUME_INGESTION_LEASE_SECONDS", 600))
+
+# PDF text extraction runs in an isolated process pool; 0 workers parses in-process.
+RESUME_EXTRACTION_WORKERS = int(os.getenv("RESUME_EXTRACTION_WORKERS", 2))
+RESUME_EXTRACTION_MAX_PAGES = int(os.getenv("RESUME_EXTRACTION_MAX_PAGES", 20))
+RESUME_EXTRACTION_TIMEOUT = int(os.getenv("RESUME_EXTRACTION_TIMEOUT", 10))  # wall-clock seconds per document
+RESUME_EXTRACTION_CPU_SECONDS = int(os.getenv("RESUME_EXTRACTION_CPU_SECONDS", 10))
+RESUME_EXTRACTION_MEMORY_MB = int(os.getenv("RESUME_EXTRACTION_MEMORY_MB", 512))
+RESUME_EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("RESUME_EXTRACTION_MAX_TASKS_PER_CHILD", 50))
+
+# Seconds between checks for job changes made by other processes when serving
+# recommendations; changes made in the same process are picked up immediately.
+JOB_RECOMMENDATION_REFRESH_SECONDS = int(os.getenv("JOB_RECOMMENDATION_REFRESH_SECONDS", 30))
+
+# Cache for the public job list and detail responses (jobs/cache.py).
+# "locmem" keeps entries per process; "file" (JOB_CACHE_LOCATION is a
+# directory) and "redis" (JOB_CACHE_LOCATION is a redis:// URL, needs the
+# redis package) share them between processes and servers.
+JOB_CACHE_BACKEND = os.getenv("JOB_CACHE_BACKEND", "locmem")
+JOB_CACHE_LOCATION = os.getenv("JOB_CACHE_LOCATION", "")
+JOB_CACHE_TTL = int(os.getenv("JOB_CACHE_TTL", 60))  # seconds; also how long applicant counts may lag
+JOB_CACHE_LOCK_TIMEOUT = int(os.getenv("JOB_CACHE_LOCK_TIMEOUT", 5))  # seconds one request may spend filling an entry
+JOB_CACHE_WAIT = float(os.getenv("JOB_CACHE_WAIT", 0.2))  # seconds a request waits on another filling the same entry
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "jobs": {
+        "BACKEND": CACHE_BACKENDS[JOB_CACHE_BACKEND],
+        "LOCATION": JOB_CACHE_LOCATION or (str(BASE_DIR / "cache" / "jobs") if JOB_CACHE_BACKEND == "file" else "jobs"),
+        "TIMEOUT": JOB_CACHE_TTL,
+        "KEY_PREFIX": "hyro",
+        "OPTIONS": {"MAX_ENTRIES": 10000} if JOB_CACHE_BACKEND != "redis" else {},
+    },
+}
+
 AUTH_USER_MODEL = 'accounts.CustomUser'
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path , include
 from drf_yasg.views import get_schema_view
@@ -45,3 +47,7 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
 
 ]
+
+# Resumes kept by the local storage backend are served by runserver in development
+if settings.DEBUG and settings.RESUME_STORAGE_BACKEND == "local":
+    urlpatterns += static(settings.RESUME_STORAGE_LOCAL_URL, document_root=settings.RESUME_STORAGE_LOCAL_ROOT)
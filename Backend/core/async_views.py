@@ -0,0 +1,108 @@
+"""
+Async counterpart of DRF's APIView for I/O-bound endpoints served under ASGI.
+
+DRF views are synchronous, so a view that spends most of its time waiting on
+the network holds a worker thread throughout. These views run on the event
+loop instead; authentication uses the project's DRF authentication classes
+(run in a thread, as they may touch the database) and responses keep the
+JSON shapes of the sync views.
+"""
+import asyncio
+import json
+import weakref
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+
+_slots = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def database_slot():
+    """
+    Run a block of database work holding one of at most
+    `ASYNC_DB_CONNECTIONS` connections per worker, and close the connection
+    when the block ends. Every request does its queries in a thread of its
+    own, so without the cap each pending request could keep a connection open
+    while it waits on the network. Must not span a transaction.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = _slots[loop] = asyncio.Semaphore(settings.ASYNC_DB_CONNECTIONS)
+
+    async with slots:
+        try:
+            yield
+        finally:
+            await _close_connection()
+
+
+@sync_to_async
+def _close_connection():
+    connection.close()
+
+
+class AsyncAPIView(View):
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+
+    # Role the authenticated user must have, e.g. "applicant"; None allows any
+    required_role = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated, like APIView
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def parse_data(request):
+        """Request body as a dict (JSON or form encoded), or None when it cannot be parsed."""
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                return None
+            return data if isinstance(data, dict) else None
+        return request.POST
+
+    def authenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            result = authentication_class().authenticate(request)
+            if result is not None:
+                return result[0]
+        return None
+
+    @staticmethod
+    def exception_response(exc):
+        # Same body the sync views get from core.exception_handler
+        data = dict(exc.detail) if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        data["status_code"] = exc.status_code
+        return JsonResponse(data, status=exc.status_code)
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            async with database_slot():
+                user = await sync_to_async(self.authenticate)(request)
+        except exceptions.APIException as e:
+            return self.exception_response(e)
+
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        if self.required_role and user.role != self.required_role:
+            return JsonResponse({"detail": "You do not have permission to perform this action."}, status=403)
+
+        request.user = user
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as e:
+            # Raised while reading the body, e.g. core.uploads.UploadTooLarge
+            return self.exception_response(e)
@@ -0,0 +1,60 @@
+"""
+Conditional GET for API views.
+
+A view decorated with `conditional_get` provides `get_validators()`, which
+returns `(version, last_modified)` for what the response would contain,
+usually from one aggregate query such as MAX(updated_at) plus COUNT(*). The
+ETag is a digest of that version together with everything else the body
+depends on: the URL, the host (pagination links are absolute) and the
+negotiated media type. When the client already holds that ETag, or holds a
+copy no older than `last_modified` and sent no ETag, the view answers
+304 Not Modified without running, so nothing is serialized.
+
+The ETag is the exact validator. A view returns a `last_modified` only
+when every change to the body moves it: MAX(updated_at) stays put when a
+row is deleted or a count changes, so the list and detail views, whose
+versions include counts, return None and answer If-None-Match alone. An
+If-Modified-Since request would otherwise get a stale 304.
+"""
+import functools
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, version):
+    material = repr((version, request.get_host(), request.get_full_path(), request.accepted_media_type))
+    return quote_etag(hashlib.sha1(material.encode()).hexdigest())
+
+
+def conditional_get(method):
+    """
+    Decorate a view's `get`. `get_validators(request, *args, **kwargs)` may
+    return None to skip the check, e.g. for an object that does not exist.
+    The version is kept on `view.version` for the handler to use.
+    """
+    @functools.wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        validators = view.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return method(view, request, *args, **kwargs)
+
+        view.version, last_modified = validators
+        etag = make_etag(request, view.version)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = method(view, request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            if timestamp is not None:
+                response.headers["Last-Modified"] = http_date(timestamp)
+            # Stored copies must be revalidated and differ per user
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+    return wrapper
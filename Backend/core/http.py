@@ -0,0 +1,51 @@
+"""
+Pooled HTTP clients.
+
+Sync code shares one thread-safe httpx.Client per process, created on first
+use, so outbound requests reuse keep-alive connections instead of opening a
+new one each time.
+
+An httpx.AsyncClient keeps its connections bound to the event loop it was
+first used on, so one async client is kept per running loop. Under an ASGI
+server that is one long-lived client per worker process, reused by every
+request.
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+from django.conf import settings
+
+_client = None
+_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+    )
+
+
+def get_client():
+    """Process-wide keep-alive client for sync code."""
+    global _client
+
+    with _lock:
+        if _client is None:
+            _client = httpx.Client(timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT), limits=_limits())
+    return _client
+
+
+def get_async_client():
+    """Keep-alive client for the current event loop."""
+    loop = asyncio.get_running_loop()
+
+    with _lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT), limits=_limits())
+            _clients[loop] = client
+    return client
@@ -0,0 +1,163 @@
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import CustomUser
+from applications.models import Application
+from core.synthetic import make_pdf, resume_text
+from jobs.models import Job
+
+SCENARIOS = ("jobs", "apply", "applicants", "recruiter_summary", "applicant_dashboard")
+DEFAULT_MIX = "jobs=40,apply=10,applicants=20,recruiter_summary=10,applicant_dashboard=20"
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS or not weight.strip().isdigit():
+            raise CommandError(f"Bad --mix entry '{part}'; expected name=weight with name one of {', '.join(SCENARIOS)}")
+        mix[name] = int(weight)
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server with a weighted mix of job listing, apply, applicant ranking and "
+        "dashboard requests as the users created by seed_data, then report throughput and "
+        "p50/p95/p99 latency per route. Applications made during the run are left in place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to keep sending requests")
+        parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Relative weight of each scenario (default {DEFAULT_MIX})")
+        parser.add_argument("--prefix", default="seed", help="Username prefix given to seed_data")
+        parser.add_argument("--users", type=int, default=200, help="Applicants to send requests as")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+
+        jobs = list(
+            Job.objects
+            .filter(created_by__username__startswith=f"{prefix}-", is_active=True)
+            .values_list("pk", "job_id", "created_by_id", "keywords")
+        )
+        applicants = list(
+            CustomUser.objects
+            .filter(username__startswith=f"{prefix}-", role="applicant")
+            .order_by("?")[:options["users"]]
+        )
+        if not jobs or not applicants:
+            raise CommandError(f"No active jobs or applicants prefixed '{prefix}-'; run seed_data first")
+
+        recruiter_ids = {created_by for _, _, created_by, _ in jobs}
+        recruiters = CustomUser.objects.filter(pk__in=recruiter_ids)
+        self.tokens = {
+            user.pk: str(RefreshToken.for_user(user).access_token)
+            for user in [*applicants, *recruiters]
+        }
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.jobs = jobs
+        self.applicants = applicants
+        self.recruiter_ids = sorted(recruiter_ids)
+        self.applied = set(
+            Application.objects.filter(user__in=applicants).values_list("user_id", "job_id")
+        )
+
+        elapsed, results = asyncio.run(self._run(options["url"], options["duration"], options["concurrency"], mix))
+        self._report(elapsed, results, options["concurrency"])
+
+    def _request(self, scenario):
+        """(route label, method, path, token, extra httpx arguments) for one request of `scenario`."""
+        rng = self.rng
+
+        if scenario == "apply":
+            for _ in range(20):
+                user = rng.choice(self.applicants)
+                pk, job_id, _, _ = rng.choice(self.jobs)
+                if (user.pk, pk) not in self.applied:
+                    self.applied.add((user.pk, pk))
+                    # A resume not seen before, so the upload is extracted and stored
+                    pdf = make_pdf(f"{resume_text(rng, user.full_name)}\nRef {self.run_id}-{user.pk}-{pk}")
+                    files = {"resume": ("resume.pdf", pdf, "application/pdf")}
+                    return "POST /applications/<job_id>/apply/", "POST", f"/applications/{job_id}/apply/", user.pk, {"files": files}
+            scenario = "jobs"
+
+        if scenario == "jobs":
+            user = rng.choice(self.applicants)
+            params = {"page": rng.randint(1, 5)}
+            if rng.random() < 0.3:
+                _, _, _, keywords = rng.choice(self.jobs)
+                params = {"search": rng.choice(keywords)}
+            return "GET /jobs/", "GET", "/jobs/", user.pk, {"params": params}
+
+        if scenario == "applicants":
+            _, job_id, recruiter_id, _ = rng.choice(self.jobs)
+            params = {"page_size": 20}
+            if rng.random() < 0.2:
+                params["min_score"] = 50
+            return "GET /applications/<job_id>/applicants/", "GET", f"/applications/{job_id}/applicants/", recruiter_id, {"params": params}
+
+        if scenario == "recruiter_summary":
+            return "GET /dashboard/recruiter/summary/", "GET", "/dashboard/recruiter/summary/", rng.choice(self.recruiter_ids), {}
+
+        user = rng.choice(self.applicants)
+        return "GET /dashboard/applicant/applications/", "GET", "/dashboard/applicant/applications/", user.pk, {}
+
+    async def _run(self, url, duration, concurrency, mix):
+        names, weights = zip(*mix.items())
+        results = defaultdict(lambda: {"latencies": [], "statuses": defaultdict(int)})
+
+        async def worker(client, deadline):
+            while time.perf_counter() < deadline:
+                label, method, path, user_id, extra = self._request(self.rng.choices(names, weights)[0])
+                headers = {"Authorization": f"Bearer {self.tokens[user_id]}"}
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, f"{url}{path}", headers=headers, **extra)
+                    outcome = str(response.status_code)
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                results[label]["latencies"].append(time.perf_counter() - started)
+                results[label]["statuses"][outcome] += 1
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+            started = time.perf_counter()
+            deadline = started + duration
+            await asyncio.gather(*(worker(client, deadline) for _ in range(concurrency)))
+            return time.perf_counter() - started, results
+
+    def _report(self, elapsed, results, concurrency):
+        total = sum(len(result["latencies"]) for result in results.values())
+        self.stdout.write(f"{total} requests in {elapsed:.1f}s, concurrency {concurrency}: {total / elapsed:.1f} req/s")
+        self.stdout.write(f"{'route':<42}{'count':>7}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'max ms':>8}  statuses")
+
+        for label, result in sorted(results.items()):
+            latencies = sorted(result["latencies"])
+            row = [percentile(latencies, p) * 1000 for p in (50, 95, 99)] + [latencies[-1] * 1000]
+            statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items()))
+            self.stdout.write(
+                f"{label:<42}{len(latencies):>7}{len(latencies) / elapsed:>8.1f}"
+                + "".join(f"{value:>8.0f}" for value in row)
+                + f"  {statuses}"
+            )
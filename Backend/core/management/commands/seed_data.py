@@ -0,0 +1,195 @@
+import hashlib
+import io
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DurationField, ExpressionWrapper
+from django.db.models.functions import Now, Random
+
+from accounts.models import CustomUser
+from applications.ingestion import document_path
+from applications.models import Application, JobCorpusStats, ResumeDocument
+from applications.scoring import score_pool
+from applications.services import clean_text
+from applications.stats import rebuild_job_stats
+from applications.storage import get_storage
+from core.synthetic import job_posting, make_pdf, person_name, resume_text
+from jobs.cache import invalidate_listings
+from jobs.models import Job
+
+# Most jobs keep the default scoring mode
+SCORING_MODES = [Job.SCORING_COVERAGE] * 3 + [Job.SCORING_BM25, Job.SCORING_TFIDF]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate recruiters, jobs, applicants and scored applications with synthetic resumes. "
+        "Every generated username starts with --prefix, so a later run with --clear removes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recruiters", type=int, default=20)
+        parser.add_argument("--jobs", type=int, default=500)
+        parser.add_argument("--applicants", type=int, default=2000)
+        parser.add_argument("--applications", type=int, default=20000)
+        parser.add_argument("--days", type=int, default=90, help="Spread creation dates over this many past days")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+        parser.add_argument("--prefix", default="seed", help="Username prefix of generated users")
+        parser.add_argument("--password", default="password", help="Password of every generated user")
+        parser.add_argument("--no-pdfs", action="store_true", help="Record resumes without writing their PDFs to storage")
+        parser.add_argument("--clear", action="store_true", help="Remove previously generated data first")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        write_pdfs = not options["no_pdfs"]
+        # Generated resumes are stored like real uploads; keep them out of the shared bucket
+        if write_pdfs and settings.RESUME_STORAGE_BACKEND != "local":
+            raise CommandError("Set RESUME_STORAGE_BACKEND=local to write generated resumes, or pass --no-pdfs")
+        if options["applications"] > options["jobs"] * options["applicants"]:
+            raise CommandError("More applications requested than there are applicant and job pairs")
+
+        if options["clear"]:
+            self._clear(prefix)
+        elif CustomUser.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users prefixed '{prefix}-' already exist; pass --clear to replace them")
+
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        password = make_password(options["password"])
+
+        with transaction.atomic():
+            recruiters = CustomUser.objects.bulk_create(
+                (
+                    CustomUser(
+                        username=f"{prefix}-recruiter-{i}",
+                        email=f"{prefix}-recruiter-{i}@example.com",
+                        password=password,
+                        role="recruiter",
+                        full_name=person_name(rng),
+                    )
+                    for i in range(options["recruiters"])
+                ),
+                batch_size=batch_size,
+            )
+            jobs = Job.objects.bulk_create(
+                (
+                    Job(
+                        created_by=rng.choice(recruiters),
+                        is_active=rng.random() < 0.85,
+                        scoring_mode=rng.choice(SCORING_MODES),
+                        **job_posting(rng),
+                    )
+                    for _ in range(options["jobs"])
+                ),
+                batch_size=batch_size,
+            )
+            self.stdout.write(f"Created {len(recruiters)} recruiters and {len(jobs)} jobs")
+
+            applicants, documents = self._create_applicants(rng, options, password, write_pdfs)
+            self.stdout.write(f"Created {len(applicants)} applicants with resumes")
+
+            applications = self._create_applications(rng, options["applications"], jobs, applicants, documents, batch_size)
+            self.stdout.write(f"Created {len(applications)} applications")
+
+            # auto_now_add stamps everything with the current time; spread it out instead
+            spread = ExpressionWrapper(Random() * timedelta(days=options["days"]), output_field=DurationField())
+            Job.objects.filter(created_by__in=recruiters).update(created_at=Now() - spread)
+            Application.objects.filter(user__in=applicants).update(applied_at=Now() - spread)
+
+            # Bulk writes skip the signals that keep the score rollups current
+            rebuild_job_stats(job.pk for job in jobs)
+
+        # Bulk writes skip the signals that retire cached listings
+        invalidate_listings()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded '{prefix}-' users; log in as {prefix}-recruiter-0 or {prefix}-applicant-0 "
+            f"with password '{options['password']}'"
+        ))
+
+    def _create_applicants(self, rng, options, password, write_pdfs):
+        prefix = options["prefix"]
+        storage = get_storage() if write_pdfs else None
+
+        applicants, documents = [], []
+        for i in range(options["applicants"]):
+            name = person_name(rng)
+            text = resume_text(rng, name)
+            pdf = make_pdf(text)
+            sha256 = hashlib.sha256(pdf).hexdigest()
+            path = document_path(sha256)
+            if storage is not None:
+                storage.upload(path, io.BytesIO(pdf))
+
+            applicants.append(CustomUser(
+                username=f"{prefix}-applicant-{i}",
+                email=f"{prefix}-applicant-{i}@example.com",
+                password=password,
+                role="applicant",
+                full_name=name,
+            ))
+            documents.append(ResumeDocument(
+                sha256=sha256,
+                storage_path=path if storage is not None else "",
+                public_url=storage.public_url(path) if storage is not None else None,
+                size=len(pdf),
+                extracted_text=clean_text(text),
+            ))
+
+        applicants = CustomUser.objects.bulk_create(applicants, batch_size=options["batch_size"])
+        # Another run may already have stored the same resume
+        ResumeDocument.objects.bulk_create(documents, batch_size=options["batch_size"], ignore_conflicts=True)
+        by_sha = ResumeDocument.objects.in_bulk([document.sha256 for document in documents], field_name="sha256")
+        return applicants, [by_sha[document.sha256] for document in documents]
+
+    def _create_applications(self, rng, count, jobs, applicants, documents, batch_size):
+        # Popular jobs draw far more applicants than the rest
+        weights = [rng.paretovariate(2) for _ in jobs]
+        pairs = set()
+        while len(pairs) < count:
+            job_index = rng.choices(range(len(jobs)), weights)[0]
+            pairs.add((rng.randrange(len(applicants)), job_index))
+
+        by_job = defaultdict(list)
+        for applicant_index, job_index in pairs:
+            by_job[job_index].append(applicant_index)
+
+        applications, corpus_stats = [], []
+        for job_index, applicant_indexes in by_job.items():
+            job = jobs[job_index]
+            texts = [documents[i].extracted_text for i in applicant_indexes]
+            # Scored as a whole pool, as a full rescore would score them
+            scores, stats = score_pool(job, texts)
+            if job.scoring_mode != Job.SCORING_COVERAGE:
+                corpus_stats.append(JobCorpusStats(job=job, **stats))
+            job.applicant_count = len(applicant_indexes)
+
+            for i, score in zip(applicant_indexes, scores):
+                applications.append(Application(
+                    user=applicants[i],
+                    job=job,
+                    document=documents[i],
+                    resume_file=documents[i].public_url,
+                    match_score=score,
+                ))
+
+        applications = Application.objects.bulk_create(applications, batch_size=batch_size)
+        JobCorpusStats.objects.bulk_create(corpus_stats, batch_size=batch_size)
+        Job.objects.bulk_update(jobs, ["applicant_count"], batch_size=batch_size)
+        return applications
+
+    def _clear(self, prefix):
+        users = CustomUser.objects.filter(username__startswith=f"{prefix}-")
+        document_ids = list(
+            Application.objects.filter(user__in=users).values_list("document_id", flat=True).distinct()
+        )
+        _, deleted = users.delete()
+        # Documents still shared with real applications are kept
+        ResumeDocument.objects.filter(pk__in=document_ids, applications__isnull=True).delete()
+        self.stdout.write(f"Removed {deleted.get(CustomUser._meta.label, 0)} generated users and their data")
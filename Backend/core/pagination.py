@@ -1,5 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
 # class JobPagination(PageNumberPagination):
 #     page_size = 10
 #     page_size_query_param = "page_size"
@@ -17,3 +25,203 @@ class JobPagination(PageNumberPagination):
             "total_results": self.page.paginator.count,
             "results": data
         })
+
+
+def approximate_count(queryset):
+    """Row estimate from the Postgres planner; avoids a full COUNT(*) scan."""
+    try:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        return None
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek-method pagination over a unique ordering.
+
+    Each page is fetched with a WHERE clause on the last row's ordering values
+    instead of an OFFSET, so deep pages cost the same as the first one and
+    rows inserted meanwhile never shift or repeat results. Cursors are opaque
+    base64 strings; an empty `cursor` parameter asks for the first page.
+    """
+    page_size = 10
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    include_approximate_count = True
+
+    # When True the paginator only kicks in if the request carries a cursor
+    # parameter, leaving unpaginated responses untouched for existing clients.
+    opt_in = False
+
+    message = "Results fetched successfully"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.opt_in and self.cursor_query_param not in request.query_params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.total = approximate_count(queryset) if self.include_approximate_count else None
+
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param), queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.build_seek_filter(position))
+
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def build_seek_filter(self, position):
+        """Rows strictly after `position` in `self.ordering`."""
+        seek = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{field.lstrip('-')}__{lookup}": position[index]})
+            for earlier in range(index):
+                condition &= Q(**{self.ordering[earlier].lstrip("-"): position[earlier]})
+            seek |= condition
+
+        # Redundant bound on the leading column lets Postgres turn the OR
+        # into an index range scan
+        leading = self.ordering[0]
+        bound = "lte" if leading.startswith("-") else "gte"
+        return Q(**{f"{leading.lstrip('-')}__{bound}": position[0]}) & seek
+
+    def encode_cursor(self, instance):
+        values = [getattr(instance, field.lstrip("-")) for field in self.ordering]
+        # isoformat() keeps microseconds, which DjangoJSONEncoder would round away
+        raw = json.dumps(values, default=lambda value: value.isoformat())
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor, model):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if len(values) != len(self.ordering):
+                raise ValueError(cursor)
+            return [self.cursor_value(model, field.lstrip("-"), value) for field, value in zip(self.ordering, values)]
+        except Exception:
+            raise NotFound("Invalid cursor")
+
+    @staticmethod
+    def cursor_value(model, name, value):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # An annotation such as a search rank; JSON keeps a double exactly
+            return float(value)
+        return field.to_python(value)
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "success": True,
+            "message": self.message,
+            "next": self.get_next_link(),
+            "next_cursor": self.get_next_cursor(),
+            "total_results": self.total,
+            "total_results_approximate": self.total is not None,
+            "results": data
+        })
+
+
+class JobKeysetPagination(KeysetPagination):
+    message = "Jobs fetched successfully"
+
+
+class JobSearchKeysetPagination(JobKeysetPagination):
+    """Keyset pages of a full-text job search, best match first like its page-number pages."""
+    ordering = ("-rank", "-created_at", "-id")
+
+
+class RecruiterJobsPagination(JobKeysetPagination):
+    opt_in = True
+
+
+class ApplicantPagination(KeysetPagination):
+    """
+    Keyset pages of a job's applicants, best match first. `top=N` returns
+    just the N best matches, with no cursor to continue from.
+    """
+    page_size = 50
+    max_page_size = 200
+    ordering = ("-match_score", "id")
+    include_approximate_count = False
+    top_query_param = "top"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.top = self.get_top(request)
+        page = super().paginate_queryset(queryset, request, view)
+        if self.top is not None:
+            self.has_next = False
+        return page
+
+    def get_top(self, request):
+        try:
+            top = int(request.query_params[self.top_query_param])
+        except (KeyError, ValueError):
+            return None
+        return max(1, min(top, self.max_page_size))
+
+    def get_page_size(self, request):
+        if self.top is not None:
+            return self.top
+        return super().get_page_size(request)
+
+
+class JobListPagination(BasePagination):
+    """
+    Page-number pagination by default, keyset pagination when a `cursor`
+    parameter is sent. Searches, annotated with their `rank`, keep their
+    relevance order in both.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if JobKeysetPagination.cursor_query_param in request.query_params:
+            searching = "rank" in queryset.query.annotations
+            self.paginator = JobSearchKeysetPagination() if searching else JobKeysetPagination()
+        else:
+            self.paginator = JobPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class CandidateSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        return Response({
+            "success": True,
+            "message": "Candidates fetched successfully",
+            "current_page": self.page.number,
+            "total_pages": self.page.paginator.num_pages,
+            "total_results": self.page.paginator.count,
+            "results": data
+        })
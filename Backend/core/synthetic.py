@@ -0,0 +1,120 @@
+"""
+Synthetic data for local load tests and benchmarks.
+
+Job postings and resumes are built from small vocabularies with a seeded
+`random.Random`, so the same seed always produces the same data. Resumes
+draw most of their skills from a few related skill groups, the way real
+candidates do, which keeps match scores spread over the whole 0-100 range
+instead of bunching near zero.
+"""
+SKILL_GROUPS = {
+    "backend": ["Python", "Django", "Django REST Framework", "PostgreSQL", "Redis", "Celery", "REST API", "FastAPI"],
+    "frontend": ["JavaScript", "TypeScript", "React", "Next.js", "CSS", "HTML", "Redux", "Tailwind"],
+    "data": ["Pandas", "NumPy", "SQL", "Spark", "Airflow", "Machine Learning", "scikit-learn", "Tableau"],
+    "devops": ["Docker", "Kubernetes", "AWS", "Terraform", "CI/CD", "Linux", "Prometheus", "Nginx"],
+    "mobile": ["Kotlin", "Swift", "Android", "iOS", "Flutter", "React Native", "Firebase", "GraphQL"],
+    "java": ["Java", "Spring Boot", "Hibernate", "Microservices", "Kafka", "MySQL", "JUnit", "Maven"],
+}
+
+TITLES = {
+    "backend": ["Backend Developer", "Python Developer", "API Engineer"],
+    "frontend": ["Frontend Developer", "UI Engineer", "React Developer"],
+    "data": ["Data Engineer", "Data Analyst", "Machine Learning Engineer"],
+    "devops": ["DevOps Engineer", "Site Reliability Engineer", "Cloud Engineer"],
+    "mobile": ["Mobile Developer", "Android Developer", "iOS Developer"],
+    "java": ["Java Developer", "Software Engineer", "Platform Engineer"],
+}
+
+SENIORITY = ["Junior", "", "Senior", "Lead"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Pied Piper"]
+LOCATIONS = ["Remote", "Bengaluru", "Pune", "Hyderabad", "Mumbai", "Delhi", "Chennai", "Berlin", "London"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Rohan", "Sara", "Kabir", "Anaya", "Vihaan", "Zoya", "Arjun", "Nisha"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Khan", "Reddy", "Gupta", "Nair", "Das", "Mehta", "Singh", "Rao", "Joshi"]
+
+FILLER = (
+    "worked closely with product and design teams to deliver features on schedule",
+    "reviewed code and mentored junior engineers",
+    "improved test coverage and reduced production incidents",
+    "wrote technical documentation and onboarding guides",
+    "participated in on call rotation and incident reviews",
+    "collaborated with stakeholders to refine requirements",
+)
+
+
+def person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def job_posting(rng):
+    """Fields of a job posting: title, description, keywords, location, experience and salary."""
+    group = rng.choice(list(SKILL_GROUPS))
+    keywords = rng.sample(SKILL_GROUPS[group], rng.randint(3, 6))
+    # Most postings also ask for something from a neighbouring field
+    if rng.random() < 0.6:
+        other = rng.choice([name for name in SKILL_GROUPS if name != group])
+        keywords.append(rng.choice(SKILL_GROUPS[other]))
+
+    level = rng.randrange(len(SENIORITY))
+    title = " ".join(filter(None, [SENIORITY[level], rng.choice(TITLES[group])]))
+    experience = level * 2 + rng.randint(0, 2)
+    salary_min = rng.randrange(4, 20) * 100000 * (level + 1)
+    description = (
+        f"We are looking for a {title.lower()} to join our team. "
+        f"You will build and maintain systems using {', '.join(keywords[:-1])} and {keywords[-1]}. "
+        f"{rng.choice(FILLER).capitalize()}. "
+        f"At least {experience} years of relevant experience is expected."
+    )
+    return {
+        "title": title,
+        "description": description,
+        "keywords": keywords,
+        "company_name": rng.choice(COMPANIES),
+        "location": rng.choice(LOCATIONS),
+        "experience_required": str(experience),
+        "salary_min": salary_min,
+        "salary_max": salary_min + rng.randrange(2, 10) * 100000,
+    }
+
+
+def resume_text(rng, name):
+    """Plain text of a resume, one line per section."""
+    groups = rng.sample(list(SKILL_GROUPS), rng.choice([1, 1, 2, 2, 3]))
+    skills = [skill for group in groups for skill in rng.sample(SKILL_GROUPS[group], rng.randint(3, 7))]
+    years = rng.randint(0, 12)
+    lines = [
+        name,
+        f"{rng.choice(TITLES[groups[0]])} with {years} years of experience",
+        f"Skills: {', '.join(skills)}",
+    ]
+    for _ in range(rng.randint(1, 4)):
+        used = ", ".join(rng.sample(skills, min(3, len(skills))))
+        lines.append(f"{rng.choice(COMPANIES)}: built services with {used}; {rng.choice(FILLER)}")
+    lines.append(f"Education: B.Tech in Computer Science, {rng.randint(2008, 2024)}")
+    return "\n".join(lines)
+
+
+def make_pdf(text):
+    """Smallest valid one-page PDF showing `text`, one line per line of text."""
+    lines = [
+        line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        for line in text.splitlines()
+    ]
+    stream = ("BT /F1 11 Tf 14 TL 72 720 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET").encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
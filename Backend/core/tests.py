@@ -1,3 +1,352 @@
-from django.test import TestCase
+"""
+Query budgets for every API route.
 
-# Create your tests here.
+Each route in config/urls.py has a maximum number of SQL queries a request
+may issue, listed in QUERY_BUDGETS. The tests in each app's tests.py seed a
+realistic dataset, call their routes and fail when a request goes over
+budget. List routes are also called with small and large result sets and
+must issue the same number of queries either way, so a serializer that
+starts querying per row fails straight away.
+
+When a change legitimately needs another query, raise the budget here, in
+the same commit.
+
+The ai app's keyword cache is tested at the end, next to its routes' budgets.
+"""
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ai import keywords
+from ai.keywords import KeywordGenerationError, generate_keywords, generate_keywords_batch
+from applications import storage
+from applications.models import Application, ResumeDocument
+from applications.stats import rebuild_job_stats
+from jobs import cache as job_cache
+from jobs.models import Job
+
+User = get_user_model()
+
+# Route (as in config/urls.py) -> maximum queries per request, authentication included
+QUERY_BUDGETS = {
+    'auth/signup/': 4,
+    'auth/login/': 1,
+    'auth/refresh/': 1,
+    'auth/me/': 1,
+    'auth/me/update/': 2,
+    'auth/me/delete/': 12,
+    'auth/candidates/<str:username>/': 2,
+    'jobs/': 3,
+    'jobs/create/': 2,
+    'jobs/me/': 3,
+    'jobs/recommended/': 4,
+    'jobs/cache/stats/': 1,
+    'jobs/<uuid:job_id>/': 3,
+    'jobs/<uuid:job_id>/edit/': 3,
+    'jobs/<uuid:job_id>/activate/': 3,
+    'jobs/<uuid:job_id>/deactivate/': 3,
+    'jobs/delete/<uuid:job_id>/': 10,
+    'applications/my-applications/': 3,
+    'applications/search/': 3,
+    'applications/<uuid:job_id>/apply/': 14,
+    'applications/<int:application_id>/status/': 2,
+    'applications/<uuid:job_id>/applicants/': 3,
+    'dashboard/recruiter/summary/': 2,
+    'dashboard/recruiter/timeseries/': 2,
+    'dashboard/jobs/<uuid:job_id>/timeseries/': 3,
+    'dashboard/applicant/applications/': 2,
+    'ai/job-keywords/': 1,
+    'ai/job-keywords/batch/': 1,
+    'docs/': 0,
+    'redoc/': 0,
+}
+
+# Includes mounted twice; the second prefix shares the first one's budgets
+ROUTE_ALIASES = {'accounts/': 'auth/'}
+
+# Django's own admin is not part of the API
+UNBUDGETED_PREFIXES = ('admin/',)
+
+RESUME_TEXT = "python django developer with rest api postgresql and docker experience"
+KEYWORDS = ["Python", "Django", "Docker", "Kubernetes"]
+
+
+def iter_routes(patterns=None, prefix=''):
+    """Full route string of every URL pattern, e.g. 'jobs/<uuid:job_id>/'."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route
+
+
+def budgeted_route(route):
+    for alias, target in ROUTE_ALIASES.items():
+        if route.startswith(alias):
+            return target + route[len(alias):]
+    return route
+
+
+@override_settings(
+    RESUME_STORAGE_BACKEND='local',
+    RESUME_EXTRACTION_WORKERS=0,
+    RESUME_INGESTION_MODE='sync',
+    AI_KEYWORD_BACKEND='stub',
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    Seeds two recruiters' jobs with a few hundred applications, and gives
+    helpers that call a route as a given user and check its query budget.
+    """
+    JOBS = 25
+    APPLICANTS = 40
+    APPLICATIONS_PER_APPLICANT = 12
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(RESUME_STORAGE_LOCAL_ROOT=media_root))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', 'recruiter@example.com', 'pass', role='recruiter')
+        cls.other_recruiter = User.objects.create_user('other', 'other@example.com', 'pass', role='recruiter')
+
+        cls.jobs = Job.objects.bulk_create(
+            Job(
+                created_by=cls.recruiter,
+                title=f"Backend Developer {i}",
+                description="Build APIs with python and django",
+                company_name="Acme",
+                location="Remote",
+                experience_required="2",
+                keywords=KEYWORDS[:2 + i % 3],
+                is_active=i % 5 != 4,
+            )
+            for i in range(cls.JOBS)
+        )
+        cls.job = cls.jobs[0]
+        cls.other_jobs = Job.objects.bulk_create(
+            Job(
+                created_by=cls.other_recruiter,
+                title=f"Data Engineer {i}",
+                description="Pipelines in python",
+                company_name="Globex",
+                location="Pune",
+                experience_required="3",
+                keywords=["Python", "Spark"],
+            )
+            for i in range(5)
+        )
+
+        cls.applicants = User.objects.bulk_create(
+            User(username=f"applicant{i}", email=f"applicant{i}@example.com", role='applicant', full_name=f"Applicant {i}")
+            for i in range(cls.APPLICANTS)
+        )
+        cls.applicant = cls.applicants[0]
+        cls.light_applicant = User.objects.create_user('light', 'light@example.com', 'pass', role='applicant')
+        cls.new_applicant = User.objects.create_user('new', 'new@example.com', 'pass', role='applicant')
+
+        documents = ResumeDocument.objects.bulk_create(
+            ResumeDocument(
+                sha256=f"{i:064x}",
+                storage_path=f"documents/{i:02x}/{i:064x}.pdf",
+                public_url=f"https://storage.example.com/{i}.pdf",
+                extracted_text=f"{RESUME_TEXT} applicant{i}",
+            )
+            for i in range(cls.APPLICANTS + 1)
+        )
+
+        applications = [
+            Application(
+                user=user,
+                job=cls.jobs[(i + offset) % cls.JOBS],
+                document=documents[i],
+                resume_file=documents[i].public_url,
+                match_score=(i * 7 + offset * 13) % 101,
+            )
+            for i, user in enumerate(cls.applicants)
+            for offset in range(cls.APPLICATIONS_PER_APPLICANT)
+        ]
+        applications.append(Application(
+            user=cls.light_applicant,
+            job=cls.jobs[1],
+            document=documents[-1],
+            resume_file=documents[-1].public_url,
+            match_score=50,
+        ))
+        Application.objects.bulk_create(applications)
+        cls.application = Application.objects.filter(user=cls.applicant).first()
+
+        for job in cls.jobs:
+            job.applicant_count = sum(1 for application in applications if application.job_id == job.pk)
+        Job.objects.bulk_update(cls.jobs, ['applicant_count'])
+        rebuild_job_stats(job.pk for job in cls.jobs)
+
+    def setUp(self):
+        # Storage backends are created once per process; start from the test settings
+        storage._storage = None
+        # Cached job responses would outlive the data of the test that filled them
+        job_cache.get_cache().clear()
+
+    def call(self, method, path, user=None, **kwargs):
+        """Request `path` as `user`; returns (response, queries issued)."""
+        headers = kwargs.pop('headers', {})
+        if user is not None:
+            headers['Authorization'] = f"Bearer {RefreshToken.for_user(user).access_token}"
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(path, headers=headers, **kwargs)
+        return response, queries
+
+    def assertWithinBudget(self, method, path, user=None, status=200, **kwargs):
+        route = budgeted_route(resolve(path.split('?')[0]).route)
+        budget = QUERY_BUDGETS[route]
+        response, queries = self.call(method, path, user, **kwargs)
+
+        self.assertEqual(response.status_code, status, getattr(response, 'data', response.content))
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{method.upper()} {route} issued {len(queries)} queries, budget is {budget}:\n"
+            + "\n".join(query['sql'] for query in queries.captured_queries),
+        )
+        return response, len(queries)
+
+    def assertConstantQueries(self, small_count, large_count):
+        """Query counts of the same route returning few and many rows must match."""
+        self.assertEqual(small_count, large_count, "query count grows with the number of rows returned")
+
+
+class RouteBudgetCoverageTests(TestCase):
+
+    def test_every_route_has_a_budget(self):
+        routes = {
+            budgeted_route(route)
+            for route in iter_routes()
+            if not route.startswith(UNBUDGETED_PREFIXES)
+        }
+        self.assertEqual(routes - QUERY_BUDGETS.keys(), set(), "routes without a query budget")
+        self.assertEqual(QUERY_BUDGETS.keys() - routes, set(), "budgets for routes that no longer exist")
+
+
+class DocumentationQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_swagger_ui(self):
+        self.assertWithinBudget('get', '/docs/')
+
+    def test_redoc(self):
+        self.assertWithinBudget('get', '/redoc/')
+
+
+class KeywordQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_job_keywords(self):
+        self.assertWithinBudget(
+            'post', '/ai/job-keywords/', self.recruiter,
+            data={'description': 'Backend developer with python, django and docker'},
+            content_type='application/json',
+        )
+
+    def test_job_keywords_batch(self):
+        self.assertWithinBudget(
+            'post', '/ai/job-keywords/batch/', self.recruiter,
+            data={'descriptions': ['Python backend developer', 'Data engineer with spark']},
+            content_type='application/json',
+        )
+
+
+KEYWORD_DESCRIPTION = "Backend developer: Python, Django and PostgreSQL"
+
+
+@override_settings(AI_KEYWORD_BACKEND='stub')
+class KeywordCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        keywords._cache.clear()
+        self.addCleanup(keywords._cache.clear)
+        self.calls = []
+
+    def backend(self, answer="python, django", started=None, release=None):
+        def call(prompt):
+            self.calls.append(prompt)
+            if started is not None:
+                started.set()
+                release.wait(5)
+            return answer
+        return mock.patch.dict(keywords.BACKENDS, {'stub': call})
+
+    def async_backend(self, answer="python, django"):
+        async def call(prompt):
+            self.calls.append(prompt)
+            return answer
+        return mock.patch.dict(keywords.ASYNC_BACKENDS, {'stub': call})
+
+    def test_repeated_description_served_from_cache(self):
+        with self.backend():
+            first = generate_keywords(KEYWORD_DESCRIPTION)
+            # Case and whitespace do not make a new description
+            second = generate_keywords(f"  {KEYWORD_DESCRIPTION.upper()}\n")
+
+        self.assertEqual(first, ["Python", "Django"])
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_concurrent_requests_share_one_call(self):
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        with self.backend(started=started, release=release):
+            threads = [threading.Thread(target=lambda: results.append(generate_keywords(KEYWORD_DESCRIPTION))) for _ in range(5)]
+            threads[0].start()
+            self.assertTrue(started.wait(5))
+            for thread in threads[1:]:
+                thread.start()
+            # Let the others find the call in flight before it answers
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, [["Python", "Django"]] * 5)
+
+    def test_failures_and_empty_answers_not_cached(self):
+        def failing(prompt):
+            self.calls.append(prompt)
+            raise RuntimeError("quota exceeded")
+
+        with mock.patch.dict(keywords.BACKENDS, {'stub': failing}):
+            with self.assertRaises(KeywordGenerationError):
+                generate_keywords(KEYWORD_DESCRIPTION)
+        with self.backend(answer=""):
+            self.assertEqual(generate_keywords(KEYWORD_DESCRIPTION), [])
+        with self.backend():
+            self.assertEqual(generate_keywords(KEYWORD_DESCRIPTION), ["Python", "Django"])
+
+        self.assertEqual(len(self.calls), 3)
+
+    def test_batch_duplicates_share_one_call(self):
+        with self.async_backend():
+            results = generate_keywords_batch([KEYWORD_DESCRIPTION, KEYWORD_DESCRIPTION.lower(), ""])
+            again = generate_keywords_batch([KEYWORD_DESCRIPTION])
+
+        self.assertEqual(results, [
+            {"keywords": ["Python", "Django"]},
+            {"keywords": ["Python", "Django"]},
+            {"error": "Description is required"},
+        ])
+        self.assertEqual(again, [{"keywords": ["Python", "Django"]}])
+        self.assertEqual(len(self.calls), 1)
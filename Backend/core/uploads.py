@@ -0,0 +1,41 @@
+"""
+Upload size limit.
+
+`MaxSizeUploadHandler` runs ahead of Django's own upload handlers. A request
+whose declared Content-Length is already over the limit is refused before
+any of its body is read. Otherwise uploads are counted as their chunks
+stream through to the next handler, which keeps small files in memory and
+spools larger ones to a temporary file, so an oversized file is cut off at
+the limit instead of being buffered whole.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import exceptions
+
+# Room for multipart boundaries, part headers and ordinary form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = 413
+    default_code = "upload_too_large"
+
+    def __init__(self, limit):
+        super().__init__(f"Uploaded file exceeds the {limit // (1024 * 1024)} MB limit")
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.limit = settings.MAX_UPLOAD_SIZE
+        if content_length > self.limit + MULTIPART_OVERHEAD:
+            raise UploadTooLarge(self.limit)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Bodies without a Content-Length are only caught here
+        if start + len(raw_data) > self.limit:
+            raise UploadTooLarge(self.limit)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
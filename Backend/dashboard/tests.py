@@ -1,3 +1,155 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from applications.models import Application, JobDailyStats, JobStats, empty_histogram
+from applications.rescoring import rescore_job_applications
+from applications.stats import add_score, rebuild_job_stats, remove_score, score_bucket
+from applications.tests import RESUME_PDF
+from core.tests import QueryBudgetTestCase
+from jobs.models import Job
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_recruiter_summary(self):
+        _, small = self.assertWithinBudget('get', '/dashboard/recruiter/summary/', self.other_recruiter)
+        _, large = self.assertWithinBudget('get', '/dashboard/recruiter/summary/', self.recruiter)
+        self.assertConstantQueries(small, large)
+
+    def test_recruiter_timeseries(self):
+        _, small = self.assertWithinBudget('get', '/dashboard/recruiter/timeseries/?days=90', self.other_recruiter)
+        _, large = self.assertWithinBudget('get', '/dashboard/recruiter/timeseries/?days=90', self.recruiter)
+        self.assertConstantQueries(small, large)
+
+    def test_job_timeseries(self):
+        self.assertWithinBudget('get', f'/dashboard/jobs/{self.job.job_id}/timeseries/?days=90', self.recruiter)
+
+    def test_applicant_applications(self):
+        _, small = self.assertWithinBudget('get', '/dashboard/applicant/applications/', self.light_applicant)
+        _, large = self.assertWithinBudget('get', '/dashboard/applicant/applications/', self.applicant)
+        self.assertConstantQueries(small, large)
+
+
+class JobStatsTests(QueryBudgetTestCase):
+    """The score rollups read by the recruiter summary stay equal to a fresh aggregate."""
+
+    def assertStatsCurrent(self, job):
+        scores = list(
+            Application.objects
+            .filter(job=job, status=Application.STATUS_COMPLETED)
+            .values_list('match_score', flat=True)
+        )
+        histogram = empty_histogram()
+        for score in scores:
+            histogram[score_bucket(score)] += 1
+
+        stats = JobStats.objects.get(job=job)
+        self.assertEqual(stats.scored, len(scores))
+        self.assertAlmostEqual(stats.score_sum, sum(scores), places=6)
+        self.assertEqual(stats.max_score, max(scores, default=None))
+        self.assertEqual(stats.histogram, histogram)
+
+        daily = JobDailyStats.objects.filter(job=job)
+        self.assertEqual(sum(row.applications for row in daily), Application.objects.filter(job=job).count())
+        self.assertEqual(sum(row.scored for row in daily), len(scores))
+        self.assertAlmostEqual(sum(row.score_sum for row in daily), sum(scores), places=6)
+        self.assertEqual([sum(bands) for bands in zip(empty_histogram(), *(row.histogram for row in daily))], histogram)
+
+    def test_summary_matches_applications(self):
+        response, _ = self.call('get', '/dashboard/recruiter/summary/', self.recruiter)
+        jobs = {job['job_id']: job for job in response.data['jobs']}
+        scores = Application.objects.filter(job__created_by=self.recruiter).values_list('match_score', flat=True)
+
+        self.assertEqual(response.data['total_jobs'], self.JOBS)
+        self.assertEqual(response.data['total_applicants'], len(scores))
+        self.assertEqual(sum(response.data['score_histogram']), len(scores))
+        self.assertAlmostEqual(response.data['average_match_score'], sum(scores) / len(scores), places=2)
+        self.assertEqual(jobs[self.job.job_id]['top_match_score'], max(
+            Application.objects.filter(job=self.job).values_list('match_score', flat=True)
+        ))
+
+    def test_apply(self):
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        self.call('post', f'/applications/{self.job.job_id}/apply/', self.new_applicant, data={'resume': resume})
+        self.assertStatsCurrent(self.job)
+
+    def test_apply_to_job_without_applications(self):
+        job = self.other_jobs[0]
+        resume = SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf')
+        self.call('post', f'/applications/{job.job_id}/apply/', self.new_applicant, data={'resume': resume})
+        self.assertStatsCurrent(job)
+
+    def test_delete_top_application(self):
+        top = Application.objects.filter(job=self.job).order_by('-match_score').first()
+        top.delete()
+        self.assertStatsCurrent(self.job)
+
+    def test_delete_user(self):
+        job_ids = list(Application.objects.filter(user=self.applicant).values_list('job_id', flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call('delete', '/auth/me/delete/', self.applicant)
+        for job in Job.objects.filter(pk__in=job_ids):
+            self.assertStatsCurrent(job)
+
+    def test_rescore(self):
+        rescore_job_applications(self.job)
+        self.assertStatsCurrent(self.job)
+
+    def test_rebuild_matches_incremental(self):
+        for score in (12.5, 99.0, 100):
+            add_score(self.job.pk, score)
+        remove_score(self.job.pk, 99.0)
+        incremental = JobStats.objects.values('scored', 'score_sum', 'max_score', 'histogram').get(job=self.job)
+
+        rebuild_job_stats([self.job.pk])
+        rebuilt = JobStats.objects.values('scored', 'score_sum', 'max_score', 'histogram').get(job=self.job)
+        self.assertEqual(incremental['histogram'], [
+            band + (1 if i == 1 else 0) + (1 if i == 9 else 0) for i, band in enumerate(rebuilt['histogram'])
+        ])
+        self.assertEqual(incremental['scored'], rebuilt['scored'] + 2)
+        self.assertAlmostEqual(incremental['score_sum'], rebuilt['score_sum'] + 112.5, places=6)
+
+
+class TimeseriesTests(QueryBudgetTestCase):
+
+    def test_recruiter_timeseries(self):
+        response, _ = self.call('get', '/dashboard/recruiter/timeseries/?days=7', self.recruiter)
+        self.assertEqual(response.status_code, 200)
+        days = response.data['days']
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[-1]['date'], timezone.localdate())
+        # Every seeded application was made today
+        self.assertEqual(days[-1]['applications'], Application.objects.filter(job__created_by=self.recruiter).count())
+        self.assertEqual(sum(day['applications'] for day in days[:-1]), 0)
+        self.assertEqual(sum(days[-1]['score_histogram']), days[-1]['scored'])
+
+    def test_job_timeseries(self):
+        response, _ = self.call('get', f'/dashboard/jobs/{self.job.job_id}/timeseries/', self.recruiter)
+        self.assertEqual(len(response.data['days']), 30)
+        self.assertEqual(response.data['days'][-1]['applications'], Application.objects.filter(job=self.job).count())
+
+    def test_job_of_another_recruiter(self):
+        response, _ = self.call('get', f'/dashboard/jobs/{self.job.job_id}/timeseries/', self.other_recruiter)
+        self.assertEqual(response.status_code, 404)
+
+    def test_days_out_of_range(self):
+        for days in ('0', '366', 'week'):
+            response, _ = self.call('get', f'/dashboard/recruiter/timeseries/?days={days}', self.recruiter)
+            self.assertEqual(response.status_code, 400)
+
+    def test_rollup_catches_up_bulk_writes(self):
+        # Bulk updates skip the signals; the command brings the recent days back in line
+        moved = Application.objects.filter(job=self.job, match_score__gte=50)
+        count = moved.count()
+        moved.update(applied_at=timezone.now() - timedelta(days=3))
+        call_command('rollup_daily_stats', days=7, stdout=StringIO())
+
+        response, _ = self.call('get', f'/dashboard/jobs/{self.job.job_id}/timeseries/?days=7', self.recruiter)
+        days = response.data['days']
+        self.assertEqual(days[-4]['applications'], count)
+        self.assertEqual(days[-1]['applications'], Application.objects.filter(job=self.job).count() - count)
+        self.assertGreaterEqual(days[-4]['average_match_score'], 50)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import RecruiterSummaryView, ApplicantApplicationsView
+from .views import RecruiterSummaryView, RecruiterTimeseriesView, JobTimeseriesView, ApplicantApplicationsView
 
 urlpatterns = [
     path("recruiter/summary/", RecruiterSummaryView.as_view()),
+    path("recruiter/timeseries/", RecruiterTimeseriesView.as_view()),
+    path("jobs/<uuid:job_id>/timeseries/", JobTimeseriesView.as_view()),
     path("applicant/applications/", ApplicantApplicationsView.as_view()),
 ]
@@ -1,12 +1,15 @@
+from datetime import timedelta
+
 from django.shortcuts import render
-from django.db.models import Count, Max
+from django.db.models import Sum
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from accounts.permissions import IsRecruiter, IsApplicant
 from jobs.models import Job
-from applications.models import Application
+from applications.models import Application, JobDailyStats, JobStats, empty_histogram
 
 
 # Create your views here.
@@ -18,35 +21,135 @@ class RecruiterSummaryView(APIView):
 
     def get(self, request):
 
-        # Get all jobs posted by this recruiter
-        jobs = Job.objects.filter(created_by=request.user)
-
-        # Annotate with applicant count + top score
-        jobs_with_stats = jobs.annotate(
-            applicants_count=Count('application'),
-            top_score=Max('application__match_score')
+        # One read of the recruiter's jobs joined to their precomputed score
+        # rollups (applications/stats.py); nothing is aggregated per request
+        jobs = (
+            Job.objects
+            .filter(created_by=request.user)
+            .order_by('-created_at')
+            .values(
+                'job_id', 'title', 'applicant_count',
+                'stats__scored', 'stats__score_sum', 'stats__max_score', 'stats__histogram',
+            )
         )
 
-        # Prepare response
-        job_list = [
-            {
-                "job_id": job.job_id,
-                "title": job.title,
-                "applicant_count": job.applicants_count,
-                "top_match_score": job.top_score or 0
-            }
-            for job in jobs_with_stats
-        ]
-
-        total_applicants = sum(job["applicant_count"] for job in job_list)
+        job_list = []
+        scored = 0
+        score_sum = 0.0
+        histogram = empty_histogram()
+        for job in jobs:
+            job_scored = job['stats__scored'] or 0
+            job_list.append({
+                "job_id": job['job_id'],
+                "title": job['title'],
+                "applicant_count": job['applicant_count'],
+                "top_match_score": job['stats__max_score'] or 0,
+                "average_match_score": round(job['stats__score_sum'] / job_scored, 2) if job_scored else 0,
+                "score_histogram": job['stats__histogram'] or empty_histogram(),
+            })
+            scored += job_scored
+            score_sum += job['stats__score_sum'] or 0
+            for band, count in enumerate(job['stats__histogram'] or ()):
+                histogram[band] += count
 
         return Response({
-            "total_jobs": jobs.count(),
-            "total_applicants": total_applicants,
+            "total_jobs": len(job_list),
+            "total_applicants": sum(job["applicant_count"] for job in job_list),
+            "average_match_score": round(score_sum / scored, 2) if scored else 0,
+            "score_histogram": histogram,
             "jobs": job_list
         })
 
 
+# Longest range the time series endpoints serve
+TIMESERIES_MAX_DAYS = 365
+
+
+def parse_days(request, default=30):
+    """The `days` query parameter, or None when it is not a number in range."""
+    value = request.query_params.get("days", default)
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        return None
+    return days if 1 <= days <= TIMESERIES_MAX_DAYS else None
+
+
+def daily_totals(rollups):
+    """Sum a JobDailyStats queryset per day in the database, one row per day."""
+    bands = {f"band{band}": Sum(f"histogram__{band}") for band in range(JobStats.SCORE_BUCKETS)}
+    rows = (
+        rollups
+        .values('day')
+        .annotate(applications=Sum('applications'), scored=Sum('scored'), score_sum=Sum('score_sum'), **bands)
+        .order_by()
+    )
+    return {
+        row['day']: {
+            "applications": row['applications'],
+            "scored": row['scored'],
+            "score_sum": row['score_sum'],
+            "histogram": [row[name] for name in bands],
+        }
+        for row in rows
+    }
+
+
+def daily_series(rollups, days):
+    """
+    One entry per day of the last `days` days, today included, from the
+    JobDailyStats in `rollups`; days without applications are zero.
+    """
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    totals = daily_totals(rollups.filter(day__gte=start, day__lte=end))
+
+    series = []
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        day = totals.get(date) or {"applications": 0, "scored": 0, "score_sum": 0, "histogram": empty_histogram()}
+        series.append({
+            "date": date,
+            "applications": day["applications"],
+            "scored": day["scored"],
+            "average_match_score": round(day["score_sum"] / day["scored"], 2) if day["scored"] else 0,
+            "score_histogram": day["histogram"],
+        })
+
+    return {"start": start, "end": end, "days": series}
+
+
+# for the recruiter to chart applications and scores per day across their jobs
+class RecruiterTimeseriesView(APIView):
+    permission_classes = [IsAuthenticated, IsRecruiter]
+
+    def get(self, request):
+        days = parse_days(request)
+        if days is None:
+            return Response({"error": f"days must be a whole number from 1 to {TIMESERIES_MAX_DAYS}"}, status=400)
+
+        # Summed per day from the daily rollups; applications are never scanned
+        rollups = JobDailyStats.objects.filter(job__created_by=request.user)
+        return Response(daily_series(rollups, days))
+
+
+# the same for one of the recruiter's jobs
+class JobTimeseriesView(APIView):
+    permission_classes = [IsAuthenticated, IsRecruiter]
+
+    def get(self, request, job_id):
+        days = parse_days(request)
+        if days is None:
+            return Response({"error": f"days must be a whole number from 1 to {TIMESERIES_MAX_DAYS}"}, status=400)
+
+        job = Job.objects.filter(job_id=job_id, created_by=request.user).values('pk', 'title').first()
+        if job is None:
+            return Response({"error": "Job not found"}, status=404)
+
+        rollups = JobDailyStats.objects.filter(job_id=job['pk'])
+        return Response({"job_id": job_id, "title": job['title'], **daily_series(rollups, days)})
+
+
 # for. the applicant to see their application history
 
 class ApplicantApplicationsView(APIView):
@@ -55,7 +158,12 @@ class ApplicantApplicationsView(APIView):
     def get(self, request):
 
         # Get all applications of this user
-        apps = Application.objects.filter(user=request.user).select_related("job")
+        apps = (
+            Application.objects
+            .filter(user=request.user)
+            .select_related("job")
+            .only("applied_at", "resume_file", "job__job_id", "job__title", "job__company_name", "job__location")
+        )
 
         history = [
             {
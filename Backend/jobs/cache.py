@@ -0,0 +1,161 @@
+"""
+Response cache for the public job list and detail endpoints.
+
+Serialized responses are kept in the `jobs` cache (see `JOB_CACHE_BACKEND`)
+under versioned keys:
+
+- a detail entry embeds the job's `updated_at` and applicant count, as
+  just read by the conditional GET check (core/conditional.py), so a
+  detail is never served stale;
+- a list entry embeds the version of the whole listing, plus a hash of its
+  query parameters, so every filter, search and page is its own entry.
+
+Saving or deleting a job bumps the listing version once the transaction
+commits, so later requests read new keys and the old entries simply age
+out. The listing version starts from the clock rather than from 1, so a
+version lost to eviction can never come back to an old key. Applicant
+counts change without a `Job` save, so listings may show them up to
+`JOB_CACHE_TTL` seconds late.
+
+On a miss one request builds the entry while concurrent requests for the
+same key wait up to `JOB_CACHE_WAIT` seconds for it, then build it
+themselves. An entry outlives its TTL by another TTL, and once expired it
+is served as is to everyone but the one request refilling it, so expiry
+never makes requests wait. Freshness is jittered so keys filled together
+do not all expire together.
+"""
+import hashlib
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "jobs"
+LIST_VERSION_KEY = "jobs:list:version"
+STATS_KEYS = ("hits", "misses", "coalesced", "stale")
+
+# Seconds between checks while waiting for another request to fill an entry
+WAIT_INTERVAL = 0.02
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_listings():
+    """Retire every cached listing."""
+    bump_version(LIST_VERSION_KEY)
+
+
+def audience(request):
+    # Recruiters are shown keywords and scoring settings, everyone else is not
+    return "recruiter" if getattr(request.user, "role", None) == "recruiter" else "public"
+
+
+def list_key(request):
+    params = sorted((name, value) for name, values in request.query_params.lists() for value in values)
+    # Pagination links are absolute, so they depend on the host asked for
+    digest = hashlib.sha1(repr((request.get_host(), params)).encode()).hexdigest()
+    return f"jobs:list:{get_version(LIST_VERSION_KEY)}:{audience(request)}:{digest}"
+
+
+def detail_key(request, job_id, version):
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()
+    return f"jobs:detail:{job_id}:{digest}:{audience(request)}"
+
+
+def _record(outcome):
+    cache = get_cache()
+    key = f"jobs:stats:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def _fill(cache, key, lock_key, build):
+    try:
+        data = build()
+        ttl = settings.JOB_CACHE_TTL
+        # Kept for another TTL past freshness, to be served while it is refilled
+        fresh_until = time.time() + ttl + random.uniform(0, ttl / 10)
+        cache.set(key, (fresh_until, data), timeout=2 * ttl)
+    finally:
+        cache.delete(lock_key)
+    return data
+
+
+def fetch(key, build):
+    """
+    Return (data, hit): the cached value of `key`, or the result of
+    `build()` which is then cached. Exceptions from `build` propagate and
+    nothing is cached.
+    """
+    cache = get_cache()
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        fresh_until, data = entry
+        if time.time() < fresh_until:
+            _record("hits")
+            return data, True
+        # Expired: one request refills it while the others keep the old copy
+        if not cache.add(lock_key, 1, timeout=settings.JOB_CACHE_LOCK_TIMEOUT):
+            _record("stale")
+            return data, True
+        _record("misses")
+        return _fill(cache, key, lock_key, build), False
+
+    if cache.add(lock_key, 1, timeout=settings.JOB_CACHE_LOCK_TIMEOUT):
+        _record("misses")
+        return _fill(cache, key, lock_key, build), False
+
+    # Another request is building this entry; wait briefly for it rather than query too
+    deadline = time.monotonic() + settings.JOB_CACHE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            _record("coalesced")
+            return entry[1], True
+
+    _record("misses")
+    return build(), False
+
+
+def stats():
+    """Hit counters of the job cache, shared by all processes when the backend is."""
+    counts = get_cache().get_many([f"jobs:stats:{name}" for name in STATS_KEYS])
+    result = {name: counts.get(f"jobs:stats:{name}", 0) for name in STATS_KEYS}
+    requests = sum(result.values())
+    result["requests"] = requests
+    served = result["hits"] + result["coalesced"] + result["stale"]
+    result["hit_rate"] = round(served / requests, 4) if requests else None
+    return result
+
+
+def reset_stats():
+    get_cache().delete_many([f"jobs:stats:{name}" for name in STATS_KEYS])
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from applications.models import Application
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Repair Job.applicant_count where it has drifted from the real number of applications"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report drifted jobs")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        actual_count = Coalesce(
+            Subquery(
+                Application.objects
+                .filter(job=OuterRef("pk"))
+                .values("job")
+                .annotate(total=Count("id"))
+                .values("total")
+            ),
+            0,
+        )
+
+        drifted = (
+            Job.objects
+            .annotate(actual=actual_count)
+            .exclude(applicant_count=F("actual"))
+            .values_list("pk", "job_id", "applicant_count", "actual")
+        )
+
+        batch = []
+        repaired = 0
+        for pk, job_id, stored, actual in drifted.iterator(chunk_size=options["batch_size"]):
+            self.stdout.write(f"{job_id}: stored {stored}, actual {actual}")
+            batch.append(pk)
+            if len(batch) >= options["batch_size"]:
+                repaired += self._repair(batch, actual_count, options["dry_run"])
+                batch = []
+        if batch:
+            repaired += self._repair(batch, actual_count, options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {repaired} drifted jobs"))
+
+    def _repair(self, pks, actual_count, dry_run):
+        if dry_run:
+            return len(pks)
+        # Recount inside the UPDATE so applications created meanwhile are not lost
+        return Job.objects.filter(pk__in=pks).update(applicant_count=actual_count)
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_vector'),
+        ('applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE jobs_job SET applicant_count = (
+                SELECT COUNT(*) FROM applications_application
+                WHERE applications_application.job_id = jobs_job.id
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
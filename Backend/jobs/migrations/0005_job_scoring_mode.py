@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_applicant_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='scoring_mode',
+            field=models.CharField(choices=[('coverage', 'Keyword coverage'), ('bm25', 'BM25'), ('tfidf', 'TF-IDF')], default='coverage', max_length=10),
+        ),
+    ]
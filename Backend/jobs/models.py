@@ -1,17 +1,32 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 import uuid
 
+# Text search configuration used by the search_vector trigger and by queries against it
+SEARCH_CONFIG = 'english'
+
 # Create your models here.
 
 class Job(models.Model):
+    SCORING_COVERAGE = 'coverage'
+    SCORING_BM25 = 'bm25'
+    SCORING_TFIDF = 'tfidf'
+    SCORING_CHOICES = [
+        (SCORING_COVERAGE, 'Keyword coverage'),
+        (SCORING_BM25, 'BM25'),
+        (SCORING_TFIDF, 'TF-IDF'),
+    ]
+
     job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
 
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='jobs'
+        related_name='jobs',
+        db_index=False,  # covered by job_recruiter_created_idx
     )
 
     title = models.CharField(max_length=255)
@@ -35,8 +50,47 @@ class Job(models.Model):
 
     is_active = models.BooleanField(default=True)
 
+    # How applications' match_score is computed (see applications.scoring)
+    scoring_mode = models.CharField(max_length=10, choices=SCORING_CHOICES, default=SCORING_COVERAGE)
+
+    # Maintained by applications.signals on application create/delete,
+    # repaired by `manage.py reconcile_applicant_counts`
+    applicant_count = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Weighted title (A), keywords (B) and description (C), kept current by a
+    # database trigger (see migration 0003_job_search_vector)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='job_search_vector_idx'),
+            # Job list: active jobs, newest first (page and cursor modes)
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_created_idx',
+            ),
+            # Recruiter's own jobs, newest first
+            models.Index(fields=['created_by', '-created_at', '-id'], name='job_recruiter_created_idx'),
+            # Change feed read by the recommendation index on every sync
+            models.Index(fields=['updated_at'], name='job_updated_at_idx'),
+        ]
+
+    # Columns written by the database or by F() updates; a plain save() must
+    # not overwrite them with the possibly stale values held by the instance
+    DERIVED_FIELDS = ('applicant_count', 'search_vector')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
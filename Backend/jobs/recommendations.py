@@ -0,0 +1,271 @@
+"""
+Job recommendations for applicants.
+
+Active jobs' keyword lists are held in memory as a sparse job x keyword
+incidence matrix, so a resume is scored against every active job with one
+sparse matrix-vector product instead of one `compute_match_score` call per
+job. Scores are the same as `compute_match_score` would give.
+
+Every process keeps its own index. It is built on first use and then kept
+current incrementally: jobs saved since the last sync (create, edit,
+activate and deactivate all bump `updated_at`) are re-read and their rows
+replaced. Deleted jobs are caught by comparing row counts, which triggers a
+rebuild.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from scipy import sparse
+
+from applications.matching import KeywordMatcher
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Jobs saved this long before the previous sync are read again, so a save
+# whose transaction committed after the sync started is not missed.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# Compact the matrix once this share of its rows belong to replaced or
+# deactivated jobs.
+COMPACT_RATIO = 0.25
+
+
+def normalize_keyword(keyword):
+    return " ".join(keyword.lower().split())
+
+
+class _Snapshot:
+    """Consistent, read-only state that requests score against."""
+
+    def __init__(self, matrix, sizes, job_ids, alive, row_of, matcher):
+        self.matrix = matrix
+        self.sizes = sizes
+        self.job_ids = job_ids
+        self.alive = alive
+        self.row_of = row_of
+        self.matcher = matcher
+
+
+class JobRecommendationIndex:
+
+    def __init__(self, refresh_seconds=30):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stale = True
+        self._synced_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._terms = []                # column -> normalized keyword
+        self._vocabulary = {}           # normalized keyword -> column
+        self._matcher = None
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._sizes = np.empty(0, dtype=np.float64)
+        self._job_ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._row_of = {}               # job pk -> live row
+        self._dead = 0
+        self._watermark = None
+
+    def mark_stale(self):
+        """Sync before the next recommendation instead of waiting for the refresh interval."""
+        self._stale = True
+
+    # Maintenance
+
+    def sync(self):
+        """Bring the index up to date with the database."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        started = timezone.now()
+        self._stale = False
+
+        if self._watermark is None:
+            self._rebuild(started)
+        else:
+            self._apply_changes(started)
+
+        self._synced_at = time.monotonic()
+        self._publish()
+
+    def _rebuild(self, started):
+        self._reset()
+        jobs = (
+            Job.objects
+            .filter(is_active=True)
+            .order_by()
+            .values_list('id', 'keywords')
+        )
+        self._append_rows(jobs.iterator(chunk_size=2000))
+        self._watermark = started
+        logger.info(f"Built job recommendation index: {len(self._row_of)} jobs, {len(self._terms)} keywords")
+
+    def _apply_changes(self, started):
+        changed = (
+            Job.objects
+            .filter(updated_at__gte=self._watermark - SYNC_OVERLAP)
+            .order_by()
+            .values_list('id', 'keywords', 'is_active')
+        )
+
+        added = []
+        for job_id, keywords, is_active in changed:
+            self._remove_row(job_id)
+            if is_active:
+                added.append((job_id, keywords))
+        self._append_rows(added)
+        self._watermark = started
+
+        # Deleted jobs leave no trace in the change feed
+        if Job.objects.filter(is_active=True).count() != len(self._row_of):
+            self._rebuild(started)
+        elif self._dead > COMPACT_RATIO * len(self._job_ids):
+            self._compact()
+
+    def _remove_row(self, job_id):
+        row = self._row_of.pop(job_id, None)
+        if row is not None:
+            self._alive[row] = False
+            self._dead += 1
+
+    def _append_rows(self, jobs):
+        indptr = [0]
+        indices = []
+        data = []
+        sizes = []
+        job_ids = []
+
+        for job_id, keywords in jobs:
+            counts = Counter(filter(None, map(normalize_keyword, keywords)))
+            for term, count in counts.items():
+                column = self._vocabulary.get(term)
+                if column is None:
+                    column = self._vocabulary[term] = len(self._terms)
+                    self._terms.append(term)
+                    self._matcher = None
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+            # Jobs without usable keywords still get an (empty) row so row
+            # counts line up with the database
+            sizes.append(len(keywords) or 1)
+            job_ids.append(job_id)
+
+        columns = len(self._terms)
+        if self._matrix.shape[1] != columns:
+            # New matrix object rather than resize(): published snapshots share it
+            matrix = self._matrix
+            self._matrix = sparse.csr_matrix(
+                (matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], columns)
+            )
+        if not job_ids:
+            return
+
+        first_row = len(self._job_ids)
+        block = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(job_ids), columns),
+        )
+        self._matrix = sparse.vstack([self._matrix, block], format='csr')
+        self._sizes = np.concatenate([self._sizes, np.array(sizes, dtype=np.float64)])
+        self._job_ids = np.concatenate([self._job_ids, np.array(job_ids, dtype=np.int64)])
+        self._alive = np.concatenate([self._alive, np.ones(len(job_ids), dtype=bool)])
+        for offset, job_id in enumerate(job_ids):
+            self._row_of[job_id] = first_row + offset
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive)
+        self._matrix = self._matrix[keep]
+        self._sizes = self._sizes[keep]
+        self._job_ids = self._job_ids[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._job_ids)}
+        self._dead = 0
+
+    def _publish(self):
+        if self._matcher is None:
+            self._matcher = KeywordMatcher({None: self._terms})
+        # Arrays are copied because later syncs update them in place
+        self._snapshot = _Snapshot(
+            matrix=self._matrix,
+            sizes=self._sizes,
+            job_ids=self._job_ids,
+            alive=self._alive.copy(),
+            row_of=dict(self._row_of),
+            matcher=self._matcher,
+        )
+
+    def _due(self):
+        return (
+            self._snapshot is None
+            or self._stale
+            or time.monotonic() - self._synced_at >= self.refresh_seconds
+        )
+
+    def _current(self):
+        if self._due():
+            # While another request is syncing, keep serving the previous snapshot
+            if self._lock.acquire(blocking=self._snapshot is None):
+                try:
+                    if self._due():
+                        self._sync()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    # Queries
+
+    def recommend(self, text, limit=10, exclude_job_ids=()):
+        """
+        Return up to `limit` (job pk, match score) pairs for the cleaned resume
+        `text`, best first. Jobs with no matching keyword are left out.
+        """
+        snapshot = self._current()
+        if not len(snapshot.job_ids) or limit <= 0:
+            return []
+
+        present = np.zeros(snapshot.matrix.shape[1], dtype=np.float32)
+        columns = [column for _, column in snapshot.matcher.find(text)]
+        if not columns:
+            return []
+        present[columns] = 1
+
+        ratios = (snapshot.matrix @ present) / snapshot.sizes
+        ratios[~snapshot.alive] = -1
+        for job_id in exclude_job_ids:
+            row = snapshot.row_of.get(job_id)
+            if row is not None:
+                ratios[row] = -1
+
+        limit = min(limit, len(ratios))
+        top = np.argpartition(-ratios, limit - 1)[:limit]
+        top = top[np.argsort(-ratios[top], kind='stable')]
+
+        return [
+            (int(snapshot.job_ids[row]), round(float(ratios[row]) * 100, 2))
+            for row in top
+            if ratios[row] > 0
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_recommendation_index():
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = JobRecommendationIndex(refresh_seconds=settings.JOB_RECOMMENDATION_REFRESH_SECONDS)
+    return _index
@@ -3,11 +3,6 @@ from .models import Job
 
 class JobSerializer(serializers.ModelSerializer):
 
-    applicant_count = serializers.SerializerMethodField()
-
-    def get_applicant_count(self, obj):
-        return obj.application_set.count()
-    
     class Meta:
         model = Job
         fields = [
@@ -15,6 +10,7 @@ class JobSerializer(serializers.ModelSerializer):
             'title',
             'description',
             'keywords',
+            'scoring_mode',
             'location',
             'experience_required',
             'salary_min',
@@ -25,7 +21,7 @@ class JobSerializer(serializers.ModelSerializer):
             'company_name',
             'requirements'
         ]
-        read_only_fields = ['job_id', 'created_at', 'is_active']
+        read_only_fields = ['job_id', 'created_at', 'is_active', 'applicant_count']
 
     def validate_keywords(self, value):
         if not isinstance(value, list):
@@ -48,8 +44,19 @@ class JobSerializer(serializers.ModelSerializer):
 
         request = self.context.get("request")
 
-        # Hide keywords unless recruiter is viewing
-        if request and request.user.role != "recruiter":
+        # Hide keywords and scoring settings unless recruiter is viewing
+        if request and getattr(request.user, "role", None) != "recruiter":
             data.pop("keywords", None)
+            data.pop("scoring_mode", None)
+
+        # Search snippet, only present when the list view annotated one
+        headline = getattr(instance, "headline", None)
+        if headline is not None:
+            data["headline"] = headline
+
+        # Resume fit, only present on recommendations
+        match_score = getattr(instance, "match_score", None)
+        if match_score is not None:
+            data["match_score"] = match_score
 
         return data
\ No newline at end of file
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_listings
+from .models import Job
+from .recommendations import get_recommendation_index
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def refresh_recommendation_index(sender, instance, **kwargs):
+    transaction.on_commit(get_recommendation_index().mark_stale)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_cached_listings(sender, instance, **kwargs):
+    # After commit, so no request can cache the old rows under the new version
+    transaction.on_commit(invalidate_listings)
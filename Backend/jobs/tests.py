@@ -1,3 +1,348 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from applications import rescoring
+from applications.models import Application, JobRescore, ResumeDocument
+from applications.services import compute_match_score
+from core.tests import KEYWORDS, RESUME_TEXT, QueryBudgetTestCase, User
+from . import cache as job_cache
+from .models import Job
+from .recommendations import get_recommendation_index
+
+
+class JobQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_job_list(self):
+        _, small = self.assertWithinBudget('get', '/jobs/?page_size=1', self.applicant)
+        _, large = self.assertWithinBudget('get', '/jobs/', self.applicant)
+        self.assertConstantQueries(small, large)
+
+    def test_job_list_search(self):
+        self.assertWithinBudget('get', '/jobs/?search=python&highlight=1', self.applicant)
+
+    def test_job_list_cursor(self):
+        response, small = self.assertWithinBudget('get', '/jobs/?cursor=&page_size=1', self.applicant)
+        _, large = self.assertWithinBudget('get', '/jobs/?cursor=&page_size=100', self.applicant)
+        self.assertConstantQueries(small, large)
+        self.assertWithinBudget('get', f"/jobs/?cursor={response.data['next_cursor']}", self.applicant)
+
+    def test_job_list_cursor_without_estimate(self):
+        with mock.patch('core.pagination.approximate_count', return_value=None):
+            response, _ = self.call('get', '/jobs/?cursor=&page_size=1', self.applicant)
+        self.assertIsNone(response.data['total_results'])
+        self.assertFalse(response.data['total_results_approximate'])
+
+    def test_recruiter_jobs(self):
+        _, small = self.assertWithinBudget('get', '/jobs/me/', self.other_recruiter)
+        _, large = self.assertWithinBudget('get', '/jobs/me/', self.recruiter)
+        self.assertConstantQueries(small, large)
+
+    def test_job_detail(self):
+        self.assertWithinBudget('get', f'/jobs/{self.job.job_id}/', self.applicant)
+
+    def test_create_job(self):
+        self.assertWithinBudget('post', '/jobs/create/', self.recruiter, data={
+            'title': 'Platform Engineer',
+            'description': 'Kubernetes and python',
+            'company_name': 'Acme',
+            'location': 'Remote',
+            'experience_required': '4',
+            'keywords': ['Kubernetes', 'Python'],
+        }, content_type='application/json', status=201)
+
+    def test_edit_job(self):
+        self.assertWithinBudget(
+            'patch', f'/jobs/{self.job.job_id}/edit/', self.recruiter,
+            data={'title': 'Senior Backend Developer'}, content_type='application/json',
+        )
+
+    def test_activate_and_deactivate(self):
+        self.assertWithinBudget('patch', f'/jobs/{self.job.job_id}/deactivate/', self.recruiter)
+        self.assertWithinBudget('patch', f'/jobs/{self.job.job_id}/activate/', self.recruiter)
+
+    def test_delete_job_without_applicants(self):
+        quiet = Job.objects.create(
+            created_by=self.recruiter, title="Quiet", description="d", company_name="Acme",
+            location="Remote", experience_required="1", keywords=KEYWORDS,
+        )
+        self.assertWithinBudget('delete', f'/jobs/delete/{quiet.job_id}/', self.recruiter, status=204)
+
+    def test_delete_job(self):
+        job = self.jobs[2]
+        keep = Application.objects.filter(job=job).first()
+        Application.objects.filter(job=job).exclude(pk=keep.pk).delete()
+
+        _, small = self.assertWithinBudget('delete', f'/jobs/delete/{job.job_id}/', self.recruiter, status=204)
+        _, large = self.assertWithinBudget('delete', f'/jobs/delete/{self.job.job_id}/', self.recruiter, status=204)
+        self.assertConstantQueries(small, large)
+
+    def test_recommendations(self):
+        get_recommendation_index().sync()
+        _, small = self.assertWithinBudget('get', '/jobs/recommended/?limit=1', self.applicant)
+        _, large = self.assertWithinBudget('get', '/jobs/recommended/?limit=50', self.applicant)
+        self.assertConstantQueries(small, large)
+
+
+class JobSearchTests(QueryBudgetTestCase):
+
+    def test_highlight_escapes_description(self):
+        Job.objects.create(
+            created_by=self.recruiter, title="Zookeeper", company_name="Acme", location="Remote",
+            description='Run zookeeper <img src=x onerror="alert(1)"> & friends', experience_required="1",
+        )
+        response, _ = self.call('get', '/jobs/?search=zookeeper&highlight=1', self.applicant)
+        [job] = response.data['results']
+        self.assertEqual(
+            job['headline'],
+            'Run <mark>zookeeper</mark> &lt;img src=x onerror=&quot;alert(1)&quot;&gt; &amp; friends',
+        )
+
+
+    def test_cursor_search_pages_in_rank_order(self):
+        for title, description in [
+            ("Zookeeper Lead", "Run zookeeper and more zookeeper"),
+            ("Ops Engineer", "Some zookeeper"),
+            ("Platform Engineer", "Some zookeeper"),
+            ("Site Reliability Engineer", "Run zookeeper clusters, tune zookeeper"),
+        ]:
+            Job.objects.create(
+                created_by=self.recruiter, title=title, description=description,
+                company_name="Acme", location="Remote", experience_required="1",
+            )
+
+        titles, cursor = [], ''
+        while cursor is not None:
+            response, _ = self.call('get', f'/jobs/?search=zookeeper&page_size=1&cursor={cursor}', self.applicant)
+            titles += [job['title'] for job in response.data['results']]
+            cursor = response.data['next_cursor']
+
+        # The same order as page-number pages; equal ranks, newest first
+        response, _ = self.call('get', '/jobs/?search=zookeeper', self.applicant)
+        self.assertEqual(titles, [job['title'] for job in response.data['results']])
+        self.assertEqual(titles[0], "Zookeeper Lead")
+        self.assertLess(titles.index("Platform Engineer"), titles.index("Ops Engineer"))
+
+
+class JobCacheTests(QueryBudgetTestCase):
+
+    def test_anonymous_list_served_from_cache(self):
+        first, _ = self.assertWithinBudget('get', '/jobs/?page=2')
+        second, queries = self.call('get', '/jobs/?page=2')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second.data, first.data)
+
+    def test_cache_entries_per_filter_and_audience(self):
+        self.call('get', '/jobs/')
+        self.assertEqual(self.call('get', '/jobs/?location=remote')[0]['X-Cache'], 'MISS')
+        recruiter_view, _ = self.call('get', '/jobs/', self.recruiter)
+        self.assertEqual(recruiter_view['X-Cache'], 'MISS')
+        self.assertIn('keywords', recruiter_view.data['results'][0])
+        self.assertNotIn('keywords', self.call('get', '/jobs/')[0].data['results'][0])
+
+    def test_deactivate_invalidates_detail_and_list(self):
+        detail = f'/jobs/{self.job.job_id}/'
+        self.call('get', detail, self.applicant)
+        listed = {job['job_id'] for job in self.call('get', '/jobs/?cursor=&page_size=100')[0].data['results']}
+        self.assertIn(str(self.job.job_id), listed)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.call('patch', f'/jobs/{self.job.job_id}/deactivate/', self.recruiter)
+
+        response, _ = self.call('get', detail, self.applicant)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertFalse(response.data['is_active'])
+        self.assertEqual(self.call('get', detail)[0].status_code, 404)
+        listed = {job['job_id'] for job in self.call('get', '/jobs/?cursor=&page_size=100')[0].data['results']}
+        self.assertNotIn(str(self.job.job_id), listed)
+
+    def test_expired_entry_served_while_refilled(self):
+        cache = job_cache.get_cache()
+        cache.set('jobs:test', (time.time() - 1, {'old': True}))
+        cache.add('jobs:test:lock', 1)
+        build = mock.Mock(return_value={'old': False})
+
+        self.assertEqual(job_cache.fetch('jobs:test', build), ({'old': True}, True))
+        build.assert_not_called()
+
+        cache.delete('jobs:test:lock')
+        self.assertEqual(job_cache.fetch('jobs:test', build), ({'old': False}, False))
+        self.assertEqual(job_cache.fetch('jobs:test', build), ({'old': False}, True))
+        build.assert_called_once()
+
+    @override_settings(JOB_CACHE_WAIT=0.05)
+    def test_waiters_build_entry_themselves_after_a_short_wait(self):
+        job_cache.get_cache().add('jobs:test:lock', 1)
+
+        started = time.monotonic()
+        self.assertEqual(job_cache.fetch('jobs:test', lambda: {'built': True}), ({'built': True}, False))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_cache_stats(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.call('get', '/jobs/')
+        self.call('get', '/jobs/')
+
+        response, _ = self.assertWithinBudget('get', '/jobs/cache/stats/', admin)
+
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+        self.assertEqual(response.data['hit_rate'], 0.5)
+        self.assertEqual(self.call('get', '/jobs/cache/stats/', self.recruiter)[0].status_code, 403)
+
+
+class JobConditionalGetTests(QueryBudgetTestCase):
+
+    def test_recruiter_jobs_not_modified(self):
+        first, _ = self.call('get', '/jobs/me/', self.recruiter)
+        etag = first['ETag']
+
+        repeat, queries = self.call('get', '/jobs/me/', self.recruiter, headers={'If-None-Match': etag})
+
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b'')
+        self.assertEqual(repeat['ETag'], etag)
+        self.assertEqual(len(queries), 2)  # user and the aggregate
+
+    def test_recruiter_jobs_modified_by_new_applicant(self):
+        etag = self.call('get', '/jobs/me/', self.recruiter)[0]['ETag']
+        Application.objects.create(user=self.new_applicant, job=self.job)
+
+        response, _ = self.call('get', '/jobs/me/', self.recruiter, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_recruiter_jobs_ignore_if_modified_since(self):
+        first, _ = self.call('get', '/jobs/me/', self.recruiter)
+        self.assertNotIn('Last-Modified', first)
+        Application.objects.filter(job=self.job).first().delete()
+
+        response, _ = self.call('get', '/jobs/me/', self.recruiter, headers={'If-Modified-Since': http_date()})
+        self.assertEqual(response.status_code, 200)
+
+    def test_recruiter_jobs_pages_have_their_own_etag(self):
+        first = self.call('get', '/jobs/me/?cursor=', self.recruiter)[0]['ETag']
+        second = self.call('get', '/jobs/me/?cursor=&page_size=20', self.recruiter)[0]['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_job_detail_not_modified_until_edited(self):
+        path = f'/jobs/{self.job.job_id}/'
+        first, _ = self.call('get', path)
+        self.assertNotIn('Last-Modified', first)
+
+        self.assertEqual(self.call('get', path, headers={'If-None-Match': first['ETag']})[0].status_code, 304)
+
+        self.call('patch', f'{path}edit/', self.recruiter, data={'title': 'Staff Engineer'}, content_type='application/json')
+        response, _ = self.call('get', path, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Staff Engineer')
+
+    def test_job_detail_etag_per_audience(self):
+        path = f'/jobs/{self.job.job_id}/'
+        public = self.call('get', path)[0]['ETag']
+        self.assertNotEqual(self.call('get', path, self.recruiter)[0]['ETag'], public)
+
+    def test_missing_job(self):
+        response, _ = self.call('get', '/jobs/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
+
+
+class JobRescoreRequestTests(QueryBudgetTestCase):
+
+    def test_keyword_edit_returns_before_rescoring(self):
+        scores = list(Application.objects.filter(job=self.job).order_by('id').values_list('match_score', flat=True))
+        rescored_on = []
+
+        with mock.patch('applications.rescoring.run_rescore', side_effect=lambda job_id: rescored_on.append(threading.current_thread())):
+            with self.captureOnCommitCallbacks(execute=True):
+                response, _ = self.call(
+                    'patch', f'/jobs/{self.job.job_id}/edit/', self.recruiter,
+                    data={'keywords': ['Kubernetes']}, content_type='application/json',
+                )
+                # Only the request is recorded while the request runs
+                self.assertEqual(rescored_on, [])
+                self.assertTrue(JobRescore.objects.filter(job=self.job, started_at__isnull=True).exists())
+            for thread in threading.enumerate():
+                if thread.name == f"rescore-job-{self.job.pk}":
+                    thread.join(5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(rescored_on), 1)
+        self.assertIsNot(rescored_on[0], threading.current_thread())
+        self.assertEqual(
+            list(Application.objects.filter(job=self.job).order_by('id').values_list('match_score', flat=True)),
+            scores,
+        )
+
+
+@override_settings(RESUME_INGESTION_MODE='sync')
+class BackgroundRescoreRecoveryTests(TransactionTestCase):
+    """Sync-mode rescores run on threads with their own connections, so the data is committed."""
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user('recruiter', 'recruiter@example.com', 'pass', role='recruiter')
+        applicant = User.objects.create_user('applicant', 'applicant@example.com', 'pass', role='applicant')
+        self.job = Job.objects.create(
+            created_by=self.recruiter, title="Backend Engineer", description="d", company_name="Acme",
+            location="Remote", experience_required="1", keywords=["Python"],
+        )
+        document = ResumeDocument.objects.create(sha256="0" * 64, extracted_text=RESUME_TEXT)
+        self.application = Application.objects.create(
+            user=applicant, job=self.job, document=document,
+            match_score=compute_match_score(RESUME_TEXT, ["Python"]),
+        )
+
+    def edit_keywords(self, keywords):
+        token = RefreshToken.for_user(self.recruiter).access_token
+        response = self.client.patch(
+            f'/jobs/{self.job.job_id}/edit/', data={'keywords': keywords},
+            content_type='application/json', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        for thread in threading.enumerate():
+            if thread.name == f"rescore-job-{self.job.pk}":
+                thread.join(10)
+
+    def assertRescoredFor(self, keywords):
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.match_score, compute_match_score(RESUME_TEXT, keywords))
+        self.assertFalse(JobRescore.objects.filter(job=self.job).exists())
+
+    def test_failed_rescore_does_not_block_later_edits(self):
+        rescore = rescoring.rescore_job_applications
+        calls = []
+
+        def fail_once(job, **kwargs):
+            calls.append(job.pk)
+            if len(calls) == 1:
+                raise RuntimeError("rescore failed")
+            return rescore(job, **kwargs)
+
+        with mock.patch('applications.rescoring.rescore_job_applications', side_effect=fail_once):
+            self.edit_keywords(["Kubernetes"])
+            self.assertTrue(JobRescore.objects.filter(job=self.job, started_at__isnull=True).exists())
+
+            self.edit_keywords(["Kubernetes", "Docker"])
+
+        self.assertEqual(len(calls), 2)
+        self.assertRescoredFor(["Kubernetes", "Docker"])
+
+    def test_abandoned_claim_is_taken_over(self):
+        # As left behind by a process that died mid-rescore
+        lease = timedelta(seconds=settings.RESUME_INGESTION_LEASE_SECONDS)
+        JobRescore.objects.create(job=self.job, started_at=timezone.now() - lease - timedelta(seconds=1))
+
+        self.edit_keywords(["Docker"])
+
+        self.assertRescoredFor(["Docker"])
@@ -1,10 +1,12 @@
 from django.urls import path
-from .views import (JobCreateView, JobUpdateView, JobActivateView, JobDeactivateView, JobListView, RecruiterJobsView, JobDetailView , JobDeleteView)
+from .views import (JobCreateView, JobUpdateView, JobActivateView, JobDeactivateView, JobListView, RecruiterJobsView, JobDetailView , JobDeleteView, JobRecommendationsView, JobCacheStatsView)
 
 urlpatterns = [
     path('', JobListView.as_view()),
     path('create/', JobCreateView.as_view()),
     path('me/', RecruiterJobsView.as_view()),
+    path('recommended/', JobRecommendationsView.as_view()),
+    path('cache/stats/', JobCacheStatsView.as_view()),
     path('<uuid:job_id>/', JobDetailView.as_view()),
     path('<uuid:job_id>/edit/', JobUpdateView.as_view()),
     path('<uuid:job_id>/activate/', JobActivateView.as_view()),
@@ -1,14 +1,21 @@
 from django.shortcuts import render
-from django.db.models import Q
+from django.db.models import Count, F, FloatField, Max, Sum, Value
+from django.db.models.functions import Cast, Replace
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
 from rest_framework.views import APIView
 from rest_framework.generics import CreateAPIView , UpdateAPIView , ListAPIView , RetrieveAPIView , DestroyAPIView
-from rest_framework.permissions import IsAuthenticated
-from accounts.permissions import IsRecruiter
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from accounts.permissions import IsApplicant, IsRecruiter
 from .serializers import JobSerializer
-from .models import Job
+from .models import Job, SEARCH_CONFIG
 from rest_framework.response import Response
 from rest_framework import status
-from core.pagination import JobPagination
+from applications.models import Application
+from applications.rescoring import request_rescore
+from core.conditional import conditional_get
+from core.pagination import JobListPagination, RecruiterJobsPagination
+from .recommendations import get_recommendation_index
+from . import cache as job_cache
 
 
 # Create your views here.
@@ -28,6 +35,15 @@ class JobUpdateView(UpdateAPIView):
     def get_queryset(self):
         # ensures recruiter only edits their own jobs
         return Job.objects.filter(created_by=self.request.user)
+
+    def perform_update(self, serializer):
+        previous_keywords = list(serializer.instance.keywords)
+        previous_mode = serializer.instance.scoring_mode
+        job = serializer.save()
+
+        # Stored match scores were computed against the old keywords or mode
+        if job.keywords != previous_keywords or job.scoring_mode != previous_mode:
+            request_rescore(job)
     
 
 class JobActivateView(APIView):
@@ -60,14 +76,28 @@ class JobDeleteView(DestroyAPIView):
     lookup_field = "job_id"
 
     def get_queryset(self):
-        qs = Job.objects.filter(created_by=self.request.user)
-        print("DELETE USER:", self.request.user)
-        print("JOBS OWNED:", qs.values_list("job_id", flat=True))
-        return qs      
+        return Job.objects.filter(created_by=self.request.user)
+
+def escape_html(expression):
+    """HTML-escape a text expression in the database, as django.utils.html.escape does."""
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")):
+        expression = Replace(expression, Value(char), Value(entity))
+    return expression
+
+
+def cached_response(key, build):
+    """Serve `build()`'s response data from the job cache, marking the response HIT or MISS."""
+    data, hit = job_cache.fetch(key, lambda: build().data)
+    return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
 
 class JobListView(ListAPIView):
     serializer_class = JobSerializer
-    pagination_class = JobPagination
+    pagination_class = JobListPagination
+    permission_classes = [AllowAny]
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(job_cache.list_key(request), lambda: super(JobListView, self).list(request, *args, **kwargs))
 
     # def get_queryset(self):
     #     queryset = Job.objects.filter(is_active=True)
@@ -89,12 +119,29 @@ class JobListView(ListAPIView):
         min_salary = self.request.query_params.get("min_salary")
         max_salary = self.request.query_params.get("max_salary")
 
+        ordering = ["-created_at"]
         if search:
-            qs = qs.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(keywords__icontains=search)
+            # Full-text search over the trigger-maintained, GIN-indexed search_vector
+            query = SearchQuery(search, search_type="websearch", config=SEARCH_CONFIG)
+            qs = qs.filter(search_vector=query).annotate(
+                # As double precision, so a cursor carries the rank exactly
+                rank=Cast(SearchRank(F("search_vector"), query), FloatField())
             )
+            ordering = ["-rank", "-created_at"]
+
+            if self.request.query_params.get("highlight") in ("1", "true"):
+                # The description is recruiter-written; escape it so <mark> is the only markup
+                qs = qs.annotate(
+                    headline=SearchHeadline(
+                        escape_html(F("description")),
+                        query,
+                        config=SEARCH_CONFIG,
+                        start_sel="<mark>",
+                        stop_sel="</mark>",
+                        max_words=35,
+                        min_words=15,
+                    )
+                )
 
         if location:
             qs = qs.filter(location__icontains=location)
@@ -108,22 +155,116 @@ class JobListView(ListAPIView):
         if max_salary:
             qs = qs.filter(salary_max__lte=max_salary)
 
-        return qs.order_by("-created_at")
+        return qs.order_by(*ordering)
 
 
 
 class RecruiterJobsView(ListAPIView):
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated, IsRecruiter]
+    pagination_class = RecruiterJobsPagination
 
     def get_queryset(self):
         return Job.objects.filter(created_by=self.request.user).order_by('-created_at')
 
+    def get_validators(self, request):
+        # Applicant counts change without touching updated_at, so they are summed in
+        latest = Job.objects.filter(created_by=request.user).aggregate(
+            count=Count("id"),
+            updated=Max("updated_at"),
+            applicants=Sum("applicant_count"),
+        )
+        # ETag only: deletions and applicant counts leave MAX(updated_at) behind
+        return (latest["count"], latest["updated"], latest["applicants"]), None
+
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
 
 class JobDetailView(RetrieveAPIView):
     serializer_class = JobSerializer
-    queryset = Job.objects.all()
     lookup_field = "job_id"
+    permission_classes = [AllowAny]
+    version = None
+
+    def get_queryset(self):
+        # Signed-in users may still open jobs they applied to or posted once closed
+        if self.request.user.is_authenticated:
+            return Job.objects.all()
+        return Job.objects.filter(is_active=True)
+
+    def get_validators(self, request, job_id):
+        row = self.get_queryset().filter(job_id=job_id).values_list("updated_at", "applicant_count").first()
+        if row is None:
+            return None
+        updated_at, applicant_count = row
+        # ETag only: the applicant count moves without updated_at
+        return (updated_at.isoformat(), applicant_count, job_cache.audience(request)), None
+
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return self.retrieve(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.version is None:
+            # No such job; nothing to cache
+            return super().retrieve(request, *args, **kwargs)
+        key = job_cache.detail_key(request, kwargs["job_id"], self.version)
+        return cached_response(key, lambda: super(JobDetailView, self).retrieve(request, *args, **kwargs))
+
+
+class JobCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(job_cache.stats())
+
+
+class JobRecommendationsView(APIView):
+    permission_classes = [IsAuthenticated, IsApplicant]
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        # Score against the most recently processed resume
+        resume_text = (
+            Application.objects
+            .filter(user=request.user, status=Application.STATUS_COMPLETED, document__isnull=False)
+            .exclude(document__extracted_text="")
+            .order_by("-applied_at")
+            .values_list("document__extracted_text", flat=True)
+            .first()
+        )
+        if not resume_text:
+            return Response(
+                {"error": "Apply to a job with your resume to get recommendations"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        applied = Application.objects.filter(user=request.user).values_list("job_id", flat=True)
+        ranked = get_recommendation_index().recommend(resume_text, limit, exclude_job_ids=set(applied))
+
+        scores = dict(ranked)
+        jobs = Job.objects.filter(pk__in=scores, is_active=True).in_bulk()
+        results = []
+        for job_pk, score in ranked:
+            job = jobs.get(job_pk)
+            if job is not None:
+                job.match_score = score
+                results.append(job)
 
+        serializer = JobSerializer(results, many=True, context={"request": request})
+        return Response({
+            "success": True,
+            "message": "Recommended jobs fetched successfully",
+            "results": serializer.data,
+        })
 
-    
\ No newline at end of file
@@ -3,6 +3,8 @@ import api from '@/api/axios'
 
 export function useRecruiter() {
   const applicants = ref([])
+  const totalApplicants = ref(0)
+  const nextCursor = ref(null)
   const currentCandidateProfile = ref(null)
   const loading = ref(false)
   const profileLoading = ref(false)
@@ -10,18 +12,25 @@ export function useRecruiter() {
 
   // 1. FETCH APPLICANTS LIST (Thin Data)
   // Endpoint: GET /api/applications/{job_id}/applicants/
-  const fetchApplicants = async (jobId) => {
+  // Results come one keyset page at a time; pass append = true to fetch the page after the last one
+  const fetchApplicants = async (jobId, append = false) => {
+    if (append && !nextCursor.value) return
+
     loading.value = true
     error.value = null
     try {
       // Note: Added /api/ prefix as per your doc flow, remove if baseURL handles it
-      const { data } = await api.get(`/applications/${jobId}/applicants/`)
+      const params = append ? { cursor: nextCursor.value } : {}
+      const { data } = await api.get(`/applications/${jobId}/applicants/`, { params })
 
       // Map response to add local UI state
-      applicants.value = data.applicants.map((app) => ({
+      const page = data.applicants.map((app) => ({
         ...app,
         isIgnored: false,
       }))
+      applicants.value = append ? [...applicants.value, ...page] : page
+      totalApplicants.value = data.total_applicants
+      nextCursor.value = data.next_cursor
     } catch (err) {
       console.error(err)
       error.value = 'Failed to load applicants.'
@@ -49,6 +58,8 @@ export function useRecruiter() {
 
   return {
     applicants,
+    totalApplicants,
+    nextCursor,
     currentCandidateProfile,
     loading,
     profileLoading,